@@ -0,0 +1,77 @@
+import sys
+import argparse
+
+from HangmanDisplay import HangmanDisplay
+from HangmanSettings import HangmanSettings
+from HangmanLetterStrategy import HangmanLetterStrategy
+from HangmanBenchmarkSuite import HangmanBenchmarkSuite
+
+
+if __name__ == '__main__':
+	"""
+	Driver code to run the benchmark suite, write its results as JSON and
+	flag the regressions against a previous result
+	"""
+
+	parser = argparse.ArgumentParser(prog='BenchmarkHangman',
+		description='Run the hangman benchmark suite. ' \
+		+ 'E.g. python BenchmarkHangman.py -o after.json --compare before.json')
+
+	parser.add_argument('-engine', help='pass engine backend for reducing the word set',
+		dest='engine', type=str, default='memory', choices=HangmanSettings._ENGINES)
+
+	parser.add_argument('-strategy', help='letter selection strategy',
+		dest='strategy', type=str, default='hybrid', choices=HangmanLetterStrategy.strategy_names())
+
+	parser.add_argument('--sizes', dest='sizes', type=int, nargs='+', default=[100, 1000],
+		help='random sample sizes of the dictionaries')
+
+	parser.add_argument('--bucket-size', dest='bucket_size', type=int, default=200,
+		help='random sample size of each worst case length bucket')
+
+	parser.add_argument('--seed', dest='seed', type=int, default=1,
+		help='random samples seed')
+
+	parser.add_argument('-o', '--output', dest='output', type=str, default='benchmark.json',
+		help='results JSON file name')
+
+	parser.add_argument('--compare', dest='previous', type=str,
+		help='previous results JSON file name to flag regressions against')
+
+	parser.add_argument('--threshold', dest='threshold', type=float, default=10.0,
+		help='slowdown percentage flagged as a regression')
+
+	parser.add_argument('--repeats', dest='repeats', type=int, default=3,
+		help='number of runs of the startup and of each scenario, the best is compared')
+
+	parser.add_argument('--min-delta-ms', dest='min_delta_ms', type=float,
+		default=HangmanBenchmarkSuite._MIN_DELTA_MS,
+		help='noise floor in milliseconds, smaller slowdowns are never regressions')
+
+	parser.add_argument('-clk', '--clock',
+		dest='clockflag', action='store_true', help='enable timing output')
+
+	args = parser.parse_args()
+
+	display = HangmanDisplay(HangmanDisplay._NONE, args.clockflag)
+
+	suite = HangmanBenchmarkSuite(args.engine, args.strategy, args.sizes, \
+		args.bucket_size, args.seed, display, args.repeats)
+
+	results = suite.run()
+
+	HangmanBenchmarkSuite.save(results, args.output)
+
+	suite.report(results)
+
+	if args.previous != None:
+		regressions = HangmanBenchmarkSuite.compare( \
+			HangmanBenchmarkSuite.load(args.previous), results, args.threshold / 100, \
+			args.min_delta_ms)
+
+		for regression in regressions:
+			display.bare("REGRESSION {}".format(regression))
+
+		display.bare("{} regressions against {}".format(len(regressions), args.previous))
+
+		if len(regressions) > 0: sys.exit(1)
@@ -5,6 +5,10 @@ class Guess:
 	def __init__(self, guess):
 		self._guess = guess
 
+	@property
+	def guess(self):
+		return self._guess
+
 	def make_guess(self, game):
 		raise Exception("Shouldn't be here")
 
@@ -1,16 +1,60 @@
 from HangmanGame import HangmanGame
 from HangmanLetterStrategy import HangmanLetterStrategy
+from HangmanTreeStrategy import HangmanTreeStrategy
+from HangmanWordPassEngine import HangmanWordPassEngine
 from HangmanSettings import HangmanSettings
+from HangmanTracer import HangmanTracer
 
 class Hangman:
 	"""
 	Abstraction to represent a real hangman game that can be played (is playable)
 	"""
 
+	#Outcome of a game by its final HangmanGame status
+	_OUTCOMES = {0: 'won', 1: 'lost', 2: 'aborted'}
 
-	def __init__(self, settings):
+
+	def __init__(self, settings, tree = None, context = None, strategy_name = None):
 		self._settings = settings
 		self._display = settings.display
+		self._tree = tree
+
+		#Letter selection strategy, defaults to the one of the settings
+		self._strategy_name = strategy_name
+
+		#Seconds spent choosing each guess of the last game played
+		self._turn_seconds = []
+
+		#Last game played: secret, score, guesses in order, outcome and nanoseconds taken
+		self._secret = None
+		self._score = None
+		self._guesses = []
+		self._outcome = None
+		self._game_ns = 0
+
+		#Games share the dictionary context, default to the one built by initialize
+		if context == None: context = HangmanWordPassEngine.context()
+
+		self._context = context
+
+
+	@property
+	def turn_seconds(self):
+		"""
+		Returns: The list of seconds the strategy took to choose each guess
+		of the last game played
+		"""
+		return self._turn_seconds
+
+
+	def record(self):
+		"""
+		Returns: dict of the last game played, its secret, score, outcome (won,
+		lost or aborted), guesses in order, number of turns and milliseconds taken
+		"""
+		return {'secret': self._secret, 'score': self._score, 'outcome': self._outcome, \
+			'guesses': self._guesses, 'turns': len(self._guesses), \
+			'ms': round(self._game_ns / 1e6, 3)}
 
 
 	def play(self, secret, maxincorrect):
@@ -26,11 +70,30 @@ class Hangman:
 		Returns:
 			score - game score
 		"""
+
+		tracer = self._display.tracer
+
+		start = HangmanTracer.now()
 		
 		game, strategy = self.__setup(secret, maxincorrect)
-		self.__run(game, strategy)
+
+		try:
+			self.__run(game, strategy)
+		finally:
+			strategy.close()
+
 		score = game.current_score()
 
+		self._secret = secret
+		self._score = score
+		self._game_ns = HangmanTracer.now() - start
+
+		if self._outcome == None:
+			self._outcome = Hangman._OUTCOMES[game.game_status()]
+
+		if tracer != None:
+			tracer.complete('game', start, {'length': len(secret), 'score': score})
+
 		return score
 		
 	def __setup(self, secret, maxincorrect):
@@ -45,14 +108,18 @@ class Hangman:
 
 		Returns:
 			game - HangmanGame
-			strategy - HangmanStrategy
+			strategy - HangmanLetterStrategy, or HangmanTreeStrategy given a decision tree
 		"""
 
-		self._display.normal("(SHHH!!) hangman secret: {}\n".format(secret))
+		self._display.normal("(SHHH!!) hangman secret: {}\n", secret)
 		
 		game = HangmanGame(secret, maxincorrect)
 				
-		strategy = HangmanLetterStrategy(game, self._settings)
+		if self._tree != None:
+			strategy = HangmanTreeStrategy(game, self._settings, self._tree)
+		else:
+			strategy = HangmanLetterStrategy(game, self._settings, self._context, \
+				self._strategy_name)
 		
 		return game, strategy
 
@@ -62,19 +129,29 @@ class Hangman:
 		Runs the hangman game.  While game is not finished, keep guessing (playing)
 		"""
 
+		self._turn_seconds = []
+		self._guesses = []
+		self._outcome = None
+
+		tracer = self._display.tracer
+
 		while game.game_status() == game.status_keep_guessing:
 			
+			start = HangmanTracer.now()
 			guess, error = strategy.next_guess(game)
+			self._turn_seconds.append((HangmanTracer.now() - start) / 1e9)
+
+			if tracer != None: tracer.complete('next_guess', start, {'guess': str(guess)})
 
 			if guess == None and error != None:
-				self._display.simple("Aborting current game... [{}]".format(error))
+				self._display.simple("Aborting current game... [{}]", error)
+				self._outcome = 'aborted'
 				break
 			
 			guess.make_guess(game)
+			self._guesses.append(guess.guess)
 
-			self._display.simple(game)
-			self._display.simple("")
-			self._display.simple("")
+			self._display.simple("{}\n\n", game)
 
 
 if __name__ == '__main__':
@@ -83,6 +160,8 @@ if __name__ == '__main__':
 	display = settings.display
 	max_incorrect = settings.max_incorrect
 
+	HangmanWordPassEngine.initialize(settings)
+
 	secret = "asterisk"
 
 	hangman = Hangman(settings)
@@ -0,0 +1,167 @@
+import json
+import math
+import time
+
+from collections import Counter
+
+
+class HangmanBatchResults:
+	"""
+	Streams the records of the games of a batch as JSON lines, one compact
+	record per game (see Hangman.record), and aggregates them online.
+
+	Memory stays flat however many games are played: the aggregates are
+	histograms, scores are small integers counted exactly and game times
+	are counted in logarithmic buckets (about 12% wide), from which the
+	percentiles are read.  The records are flushed every _FLUSH_RECORDS
+	games or _FLUSH_SECONDS, so they can be consumed while the batch runs.
+	"""
+
+	_FLUSH_RECORDS = 1024
+	_FLUSH_SECONDS = 1.0
+
+	#time histogram buckets per decade of milliseconds
+	_TIME_BUCKETS = 20
+
+	_PERCENTILES = [50, 90, 99]
+
+
+	def __init__(self, fd):
+		"""
+		Args:
+			fd - file object written with the records e.g. sys.stdout
+		"""
+
+		self._fd = fd
+		self._pending = 0
+		self._flushed = time.time()
+
+		self._count = 0
+		self._total = 0
+		self._scores = Counter()
+		self._times = Counter()
+		self._outcomes = Counter()
+
+		#length -> [games, total score]
+		self._lengths = {}
+
+
+	def add(self, record):
+		"""
+		Write the game record and add it to the aggregates
+		"""
+
+		self._fd.write(json.dumps(record, separators=(',', ':')))
+		self._fd.write('\n')
+
+		self._pending += 1
+
+		if self._pending >= HangmanBatchResults._FLUSH_RECORDS or \
+				time.time() - self._flushed >= HangmanBatchResults._FLUSH_SECONDS:
+			self.flush()
+
+		score = record['score']
+
+		self._count += 1
+		self._total += score
+		self._scores[score] += 1
+		self._times[HangmanBatchResults.__time_bucket(record['ms'])] += 1
+		self._outcomes[record['outcome']] += 1
+
+		length = len(record['secret'])
+		stats = self._lengths.get(length)
+
+		if stats == None:
+			stats = self._lengths[length] = [0, 0]
+
+		stats[0] += 1
+		stats[1] += score
+
+
+	def flush(self):
+
+		self._fd.flush()
+
+		self._pending = 0
+		self._flushed = time.time()
+
+
+	def close(self):
+		"""
+		Flush the records, closing the file unless it is stdout
+		"""
+
+		self.flush()
+
+		if self._fd.name != '<stdout>': self._fd.close()
+
+
+	def summary(self):
+		"""
+		Returns: dict of the aggregates, games, average score, score histogram
+		and percentiles, game time percentiles in milliseconds, average score
+		per word length and the count of each outcome
+		"""
+
+		summary = {'games': self._count, 'average_score': float(self._total) / max(self._count, 1),
+			'scores': dict(self._scores), 'outcomes': dict(self._outcomes),
+			'lengths': dict((length, float(total) / games) \
+				for length, (games, total) in self._lengths.iteritems())}
+
+		for percentile in HangmanBatchResults._PERCENTILES:
+			summary['score_p{}'.format(percentile)] = \
+				HangmanBatchResults.__percentile(self._scores, self._count, percentile)
+
+			bucket = HangmanBatchResults.__percentile(self._times, self._count, percentile)
+
+			summary['ms_p{}'.format(percentile)] = None if bucket == None else \
+				round(10 ** (float(bucket + 1) / HangmanBatchResults._TIME_BUCKETS), 3)
+
+		return summary
+
+
+	def report(self, display):
+		"""
+		Display the aggregates
+		"""
+
+		summary = self.summary()
+
+		display.bare("Games {}, average score {:.4f}, won {}, lost {}, aborted {}", summary['games'], \
+			summary['average_score'], summary['outcomes'].get('won', 0), \
+			summary['outcomes'].get('lost', 0), summary['outcomes'].get('aborted', 0))
+
+		display.bare("Score p50 {}, p90 {}, p99 {}; game time p50 {}ms, p90 {}ms, p99 {}ms (upper bounds)", \
+			summary['score_p50'], summary['score_p90'], summary['score_p99'], \
+			summary['ms_p50'], summary['ms_p90'], summary['ms_p99'])
+
+		display.bare("Score histogram {}", ", ".join("{}: {}".format(score, games) \
+			for score, games in sorted(summary['scores'].iteritems())))
+
+		display.bare("Average score by length {}", ", ".join("{}: {:.3f}".format(length, mean) \
+			for length, mean in sorted(summary['lengths'].iteritems())))
+
+
+	@staticmethod
+	def __time_bucket(ms):
+		"""
+		Returns: The logarithmic bucket of the milliseconds, the bucket b
+		holding the times up to 10 ** ((b + 1) / _TIME_BUCKETS)
+		"""
+		return int(math.floor(math.log10(max(ms, 0.001)) * HangmanBatchResults._TIME_BUCKETS))
+
+
+	@staticmethod
+	def __percentile(histogram, count, percentile):
+		"""
+		Returns: The nearest rank percentile value of the histogram
+		"""
+
+		if count == 0: return None
+
+		rank = int(round(percentile / 100.0 * (count - 1)))
+
+		for value in sorted(histogram.keys()):
+			rank -= histogram[value]
+
+			if rank < 0: return value
@@ -0,0 +1,335 @@
+import json
+import platform
+import random
+import timeit
+
+from Hangman import Hangman
+from HangmanSettings import HangmanSettings
+from HangmanWordPassEngine import HangmanWordPassEngine
+from HangmanPhaseTimings import HangmanPhaseTimings
+
+
+class HangmanBenchmarkSuite:
+	"""
+	Reproducible benchmark suite of the game play.
+
+	Scenarios, the random ones seeded:
+		baseline - the fixed HangmanSettings baseline secrets from words.txt
+		words_<n> - random samples of n words.txt words
+		big_<n> - random samples of n words_big.txt words
+		length_<l> - random samples of the 7 to 10 letter words of words.txt,
+			the largest length buckets
+
+	Measured per dictionary: startup (engine initialize).  Per scenario: games/sec,
+	average score and the duration percentiles of the game phases, recorded
+	from the tracer spans of the same names:
+		setup - engine setup of each game
+		reduce - engine reduce of each turn, filter and tally included
+		filter - candidate words filtering of each reduce
+		tally - tally of each reduce
+		next_guess - strategy next guess of each turn
+		game - whole game
+
+	Startup and every scenario are run repeats times, the results keep the
+	samples of every run along with their best (lowest duration, highest
+	games/sec) value.
+
+	Results are plain dicts written as JSON, compare flags the regressions
+	of a result against a previous one: the best samples are compared, and a
+	slowdown is only flagged beyond both the relative threshold and the noise,
+	the larger of an absolute floor and the spread of either side's samples.
+	So a slowdown has to show up in every repeat to be flagged.
+	"""
+
+	_FORMAT_VERSION = 2
+
+	_DICTIONARIES = {'words':'words.txt', 'big':'words_big.txt'}
+
+	_WORST_LENGTHS = [7, 8, 9, 10]
+
+	#phase duration percentiles compared for regressions, the tail ones are too noisy
+	_COMPARED_STATS = ['p50_ms']
+
+	#default noise floor, differences below this many milliseconds are never regressions
+	_MIN_DELTA_MS = 0.05
+
+
+	def __init__(self, engine, strategy, sizes, bucket_size, seed, display, repeats = 3):
+
+		self._engine = engine
+		self._strategy = strategy
+		self._sizes = sizes
+		self._bucket_size = bucket_size
+		self._seed = seed
+		self._display = display
+		self._repeats = max(1, repeats)
+
+
+	def run(self):
+		"""
+		Run every scenario
+
+		Returns: The results dict
+		"""
+
+		results = {'version': HangmanBenchmarkSuite._FORMAT_VERSION,
+			'engine': self._engine, 'strategy': self._strategy, 'seed': self._seed,
+			'sizes': self._sizes, 'bucket_size': self._bucket_size, 'repeats': self._repeats,
+			'python': platform.python_version(), 'dictionaries': {}, 'scenarios': {}}
+
+		for key in ['words', 'big']:
+			dictfile = HangmanBenchmarkSuite._DICTIONARIES[key]
+
+			settings = HangmanSettings(['-f', dictfile, '-bl', \
+				'-engine', self._engine, '-strategy', self._strategy])
+
+			self._display.clock("Initializing {}", dictfile)
+
+			startups = []
+
+			for _ in xrange(self._repeats):
+				# the last release frees the dictionary, each initialize loads it again
+				HangmanWordPassEngine.cleanup()
+
+				start = timeit.default_timer()
+				HangmanWordPassEngine.initialize(settings)
+				startups.append(1000 * (timeit.default_timer() - start))
+
+			context = HangmanWordPassEngine.context()
+
+			results['dictionaries'][dictfile] = {'startup_ms': min(startups), \
+				'startup_samples_ms': startups, 'words': len(context.word_index), \
+				'content_hash': context.word_index.content_hash}
+
+			for name, secrets in self.__scenarios(key, settings, context):
+				self._display.clock("Running scenario {}", name)
+
+				runs = [self.__run_scenario(settings, context, secrets) for _ in xrange(self._repeats)]
+
+				results['scenarios'][name] = HangmanBenchmarkSuite.__combine(runs)
+
+			HangmanWordPassEngine.cleanup()
+
+		return results
+
+
+	def __scenarios(self, key, settings, context):
+		"""
+		Returns: The list of (name, secrets) scenarios played on the dictionary
+		"""
+
+		word_index = context.word_index
+
+		words = [word for length in word_index.lengths() for word in word_index.bucket(length)]
+
+		scenarios = []
+
+		if key == 'words':
+			scenarios.append(('baseline', list(settings.get_secrets())))
+
+		for size in self._sizes:
+			name = '{}_{}'.format(key, size)
+			scenarios.append((name, self.__sample(name, words, size)))
+
+		if key == 'words':
+			for length in HangmanBenchmarkSuite._WORST_LENGTHS:
+				name = 'length_{}'.format(length)
+				scenarios.append((name, self.__sample(name, word_index.bucket(length), self._bucket_size)))
+
+		return scenarios
+
+
+	def __sample(self, name, words, size):
+		"""
+		Returns: A random sample of the words, the same for a given seed and scenario
+		"""
+
+		rng = random.Random('{}-{}'.format(self._seed, name))
+
+		return rng.sample(words, min(size, len(words)))
+
+
+	def __run_scenario(self, settings, context, secrets):
+
+		timings = HangmanPhaseTimings()
+
+		# every scenario starts with no game states cached
+		context.state_cache.clear()
+		settings.display.set_tracer(timings)
+
+		total = 0
+
+		start = timeit.default_timer()
+
+		try:
+			for secret in secrets:
+				hangman = Hangman(settings, None, context)
+				total += hangman.play(secret, settings.max_incorrect)
+
+		finally:
+			settings.display.set_tracer(None)
+
+		elapsed = timeit.default_timer() - start
+
+		return {'games': len(secrets), 'average_score': float(total) / max(len(secrets), 1),
+			'games_per_sec': len(secrets) / elapsed, 'phases': timings.summary()}
+
+
+	@staticmethod
+	def __combine(runs):
+		"""
+		Returns: The scenario result of its repeated runs, the best value of each
+		measure along with the samples of the compared ones
+		"""
+
+		first = runs[0]
+
+		combined = {'games': first['games'], 'average_score': first['average_score'], \
+			'games_per_sec': max(run['games_per_sec'] for run in runs), \
+			'games_per_sec_samples': [run['games_per_sec'] for run in runs], 'phases': {}}
+
+		# the strategy is deterministic, a score differing between runs is a bug
+		for run in runs:
+			if run['average_score'] != first['average_score']:
+				raise Exception("Scenario average score differs between runs: {} vs {}".format( \
+					first['average_score'], run['average_score']))
+
+		for phase, stats in first['phases'].iteritems():
+			phase_runs = [run['phases'][phase] for run in runs if phase in run['phases']]
+
+			combined_stats = {}
+
+			for stat, value in stats.iteritems():
+				if stat.endswith('_ms'):
+					combined_stats[stat] = min(phase_stats[stat] for phase_stats in phase_runs)
+				else:
+					combined_stats[stat] = value
+
+			for stat in HangmanBenchmarkSuite._COMPARED_STATS:
+				combined_stats[stat + '_samples'] = [phase_stats[stat] for phase_stats in phase_runs]
+
+			combined['phases'][phase] = combined_stats
+
+		return combined
+
+
+	@staticmethod
+	def compare(previous, current, threshold, min_delta_ms = None):
+		"""
+		Compare a result to a previous one, scenarios or phases missing from
+		either are skipped
+
+		Args:
+			previous - the previous results dict
+			current - the results dict
+			threshold - relative slowdown flagged as a regression e.g. 0.1 for 10%
+			min_delta_ms - noise floor, slowdowns of fewer milliseconds are never
+				flagged, _MIN_DELTA_MS by default
+
+		Returns: list of regression description strings
+		"""
+
+		if min_delta_ms == None: min_delta_ms = HangmanBenchmarkSuite._MIN_DELTA_MS
+
+		slower = lambda before, after: \
+			HangmanBenchmarkSuite.__slower(before, after, threshold, min_delta_ms)
+
+		for key in ['version', 'engine', 'strategy', 'seed', 'sizes', 'bucket_size']:
+			if previous.get(key) != current.get(key):
+				raise Exception("Benchmark results differ in {}: {} vs {}".format( \
+					key, previous.get(key), current.get(key)))
+
+		regressions = []
+
+		for dictfile, stats in sorted(current['dictionaries'].iteritems()):
+			before = previous['dictionaries'].get(dictfile)
+
+			if before == None: continue
+
+			if slower(before['startup_samples_ms'], stats['startup_samples_ms']):
+				regressions.append("{} startup {:.3f}ms -> {:.3f}ms".format( \
+					dictfile, before['startup_ms'], stats['startup_ms']))
+
+		for name, scenario in sorted(current['scenarios'].iteritems()):
+			before = previous['scenarios'].get(name)
+
+			if before == None: continue
+
+			# the strategy is deterministic, any score change is a behavior change
+			if before['average_score'] != scenario['average_score']:
+				regressions.append("{} average score {} -> {}".format( \
+					name, before['average_score'], scenario['average_score']))
+
+			# compared as milliseconds per game
+			per_game = lambda samples: [1000 / games_per_sec for games_per_sec in samples]
+
+			if slower(per_game(before['games_per_sec_samples']), per_game(scenario['games_per_sec_samples'])):
+				regressions.append("{} games/sec {:.1f} -> {:.1f}".format( \
+					name, before['games_per_sec'], scenario['games_per_sec']))
+
+			for phase, stats in sorted(scenario['phases'].iteritems()):
+				phase_before = before['phases'].get(phase)
+
+				if phase_before == None: continue
+
+				for stat in HangmanBenchmarkSuite._COMPARED_STATS:
+					if slower(phase_before[stat + '_samples'], stats[stat + '_samples']):
+						regressions.append("{} {} {} {:.3f}ms -> {:.3f}ms".format( \
+							name, phase, stat, phase_before[stat], stats[stat]))
+
+		return regressions
+
+
+	@staticmethod
+	def __slower(before_samples, after_samples, threshold, min_delta_ms):
+		"""
+		Returns: True if the best duration of the after samples is slower than
+		the best before one by more than the threshold and the noise, the
+		larger of min_delta_ms and the spread of either side's samples
+		"""
+
+		before_ms, after_ms = min(before_samples), min(after_samples)
+
+		noise = max(min_delta_ms, max(before_samples) - before_ms, max(after_samples) - after_ms)
+
+		return after_ms > before_ms * (1 + threshold) and after_ms - before_ms > noise
+
+
+	@staticmethod
+	def save(results, name):
+
+		with open(name, 'w') as fd:
+			json.dump(results, fd, indent=1, sort_keys=True)
+
+
+	@staticmethod
+	def load(name):
+
+		with open(name) as fd:
+			return json.load(fd)
+
+
+	def report(self, results):
+		"""
+		Display the results as a table, one scenario per row
+		"""
+
+		display = self._display
+
+		for dictfile, stats in sorted(results['dictionaries'].iteritems()):
+			display.bare("{} startup {:.1f}ms, {} words".format(dictfile, stats['startup_ms'], stats['words']))
+
+		row = "{:<12} {:>6} {:>10} {:>10} {:>10} {:>11} {:>10} {:>10} {:>10}"
+
+		display.bare(row.format('scenario', 'games', 'avg score', 'games/sec', \
+			'setup p50', 'reduce p50', 'tally p50', 'guess p50', 'guess p99'))
+
+		for name, scenario in sorted(results['scenarios'].iteritems()):
+			phases = scenario['phases']
+
+			p = lambda phase, stat: '{:.3f}'.format(phases[phase][stat]) if phase in phases else '-'
+
+			display.bare(row.format(name, scenario['games'], \
+				'{:.4f}'.format(scenario['average_score']), '{:.1f}'.format(scenario['games_per_sec']), \
+				p('setup', 'p50_ms'), p('reduce', 'p50_ms'), p('tally', 'p50_ms'), \
+				p('next_guess', 'p50_ms'), p('next_guess', 'p99_ms')))
@@ -1,12 +1,15 @@
+import sys
 import time
 
 class HangmanClock:
 	"""
-	Simple convenience class to handle timing
+	Simple convenience class to handle timing, written to the out stream
+	(stdout by default)
 	"""
 
 
-	def __init__(self):
+	def __init__(self, out = None):
+		self._out = out if out != None else sys.stdout
 		self._starttime = int(time.time() * 1000)
 		self._lasttime = None
 		self._counter = 1
@@ -22,13 +25,13 @@ class HangmanClock:
 		now = int(time.time() * 1000)
 
 		if(self._lasttime == None):
-			print("[CLK][{}][{}] {}".format(self._counter, now, msg))
+			self._out.write("[CLK][{}][{}] {}\n".format(self._counter, now, msg))
 
 		else:
 			diff_from_start = now - self._starttime
 			diff_from_last = now - self._lasttime
 
-			print("[CLK][{}][{}][{}][{}] {}".format(self._counter, 
+			self._out.write("[CLK][{}][{}][{}][{}] {}\n".format(self._counter, 
 				now, diff_from_start, diff_from_last, msg))
 
 		self._counter += 1
@@ -0,0 +1,185 @@
+import copy
+import marshal
+import zlib
+
+from collections import Counter
+
+from HangmanLetterStrategy import HangmanLetterStrategy
+from HangmanWordIndex import HangmanWordIndex
+
+
+class HangmanDecisionTree:
+	"""
+	Offline compiled guess decision tree, one tree per word length.
+
+	Replays the HangmanLetterStrategy letter selection over every reachable game
+	state of the dictionary.  Starting with the whole length bucket, the chosen
+	letter splits the word set by the positions it would reveal (0 for a wrong
+	guess), each part becomes a child state, until a single word is left,
+	the game is won or the game is lost.
+
+	A node is a (guess, children) tuple, guess is a letter with children mapping
+	the revealed positions bitmask to the next node, or the final word with
+	children None.  Trees are stored marshalled and zlib compressed along with
+	the dictionary content hash and max number of wrong guesses they were
+	compiled for.
+
+	Used by HangmanTreeStrategy to play a game with one lookup per turn.
+	"""
+
+	_FORMAT_VERSION = 1
+
+	def __init__(self, content_hash, max_incorrect, roots):
+
+		self._content_hash = content_hash
+		self._max_incorrect = max_incorrect
+		self._roots = roots
+
+
+	@staticmethod
+	def compile(word_index, max_incorrect, display):
+		"""
+		Compile the decision trees of every word length in the dictionary index
+		"""
+
+		roots = {}
+
+		for length in word_index.lengths():
+			display.clock("Compiling decision tree for length {}", length)
+
+			roots[length] = HangmanDecisionTree.__compile_length(word_index, length, max_incorrect)
+
+		return HangmanDecisionTree(word_index.content_hash, max_incorrect, roots)
+
+
+	@staticmethod
+	def __compile_length(word_index, length, max_incorrect):
+
+		bucket = word_index.bucket(length)
+		_, positions = word_index.masks(length)
+
+		ids = range(len(bucket))
+
+		# mirror the engine setup, later games get a deep copy of the cached first pass
+		tally = copy.deepcopy(HangmanDecisionTree.__tally(bucket, ids, set()))
+
+		compiler = (bucket, positions, (1 << length) - 1, max_incorrect)
+
+		return HangmanDecisionTree.__compile_node(compiler, ids, tally, frozenset(), 0, 0)
+
+
+	@staticmethod
+	def __compile_node(compiler, ids, tally, guessed, wrong, known):
+		"""
+		Compile the node of the state with word set ids, unique letter tally,
+		guessed letters, number of wrong guesses and known positions bitmask
+		"""
+
+		bucket, positions, all_known, max_incorrect = compiler
+
+		if len(ids) == 1: return (bucket[ids[0]], None)
+
+		# the strategy records its counts through set_letter_counts, which
+		# rebuilds the counter, keep the same letter ordering for tie breaks
+		letter, _ = HangmanLetterStrategy.select_letter(Counter() + tally, len(ids))
+
+		guessed = guessed | frozenset(letter)
+		letter_positions = positions[ord(letter) - HangmanWordIndex.LETTER_BASE]
+
+		# split the word set by the positions the letter would reveal
+		parts = {}
+		order = []
+
+		for word_id in ids:
+			revealed = letter_positions[word_id]
+
+			part = parts.get(revealed)
+
+			if part == None:
+				part = parts[revealed] = []
+				order.append(revealed)
+
+			part.append(word_id)
+
+		children = {}
+
+		for revealed in order:
+			part = parts[revealed]
+
+			part_wrong = wrong + (1 if revealed == 0 else 0)
+			part_known = known | revealed
+
+			# game lost or won, no further guesses
+			if part_wrong > max_incorrect or part_known == all_known: continue
+
+			part_tally = HangmanDecisionTree.__tally(bucket, part, guessed)
+
+			children[revealed] = HangmanDecisionTree.__compile_node(compiler, part, \
+				part_tally, guessed, part_wrong, part_known)
+
+		return (letter, children)
+
+
+	@staticmethod
+	def __tally(bucket, ids, exclusion):
+		"""
+		Tally the unique word letters of the word set in word id order, ignoring the
+		letters found in the exclusion set, as the pass engines do
+		"""
+
+		tally = Counter()
+
+		for word_id in ids:
+			processed = set()
+
+			for letter in bucket[word_id]:
+				if letter in exclusion: continue
+
+				if letter not in processed:
+					tally[letter] += 1
+					processed.add(letter)
+
+		return tally
+
+
+	def save(self, name):
+
+		header = (HangmanDecisionTree._FORMAT_VERSION, self._content_hash, self._max_incorrect)
+
+		with open(name, 'wb') as fd:
+			fd.write(zlib.compress(marshal.dumps((header, self._roots)), 9))
+
+
+	@staticmethod
+	def load(name):
+
+		with open(name, 'rb') as fd:
+			header, roots = marshal.loads(zlib.decompress(fd.read()))
+
+		version, content_hash, max_incorrect = header
+
+		if version != HangmanDecisionTree._FORMAT_VERSION:
+			raise Exception("Unsupported decision tree format version {}".format(version))
+
+		return HangmanDecisionTree(content_hash, max_incorrect, roots)
+
+
+	def validate(self, word_index, max_incorrect):
+		"""
+		Ensure the trees were compiled from the same dictionary and game rules
+		"""
+
+		if self._content_hash != word_index.content_hash:
+			raise Exception("Decision tree was compiled from a different dictionary")
+
+		if self._max_incorrect != max_incorrect:
+			raise Exception("Decision tree was compiled for {} wrong guesses, not {}".format( \
+				self._max_incorrect, max_incorrect))
+
+
+	def root(self, length):
+		"""
+		Returns: The root node of the word length tree, None if the dictionary
+		has no words of that length
+		"""
+		return self._roots.get(length)
@@ -0,0 +1,117 @@
+from collections import Counter
+
+from HangmanGame import HangmanGame
+from HangmanLetterStrategy import HangmanLetterStrategy
+from HangmanLetterTally import HangmanLetterTally
+from HangmanPatternPartition import HangmanPatternPartition
+from HangmanWordIndex import HangmanWordIndex
+
+
+class HangmanDictionaryEvaluation:
+	"""
+	Exact game score of every dictionary word under a letter strategy, without
+	playing one game per word.
+
+	The games of all the words of a length bucket start in the same state, so
+	the bucket starts as one group.  The strategy's next letter is chosen once
+	for the whole group, which it splits by the positions the letter would
+	reveal (0 for a wrong guess), as HangmanDecisionTree compiles its nodes.
+	Each part carries on as a group until it is a single word (guessed next),
+	the game is won or the game is lost.  Every word is visited once per
+	guess, the total work is about the number of words times the game depth.
+
+	The groups replay the pass engines' tallies (unique letters in word id
+	order, guessed letters left out), so the letter choices and tie breaks,
+	hence the scores, are the ones of the games.
+	"""
+
+	def __init__(self, word_index, max_incorrect, strategy_name = 'hybrid'):
+
+		self._word_index = word_index
+		self._max_incorrect = max_incorrect
+		self._strategy_name = strategy_name
+
+
+	def evaluate(self, display):
+		"""
+		Generator function yielding the (word, score) of every dictionary word,
+		length bucket by length bucket in word id order
+		"""
+
+		for length in self._word_index.lengths():
+			display.clock("Evaluating length {}", length)
+
+			bucket = self._word_index.bucket(length)
+
+			for word_id, score in enumerate(self.__evaluate_length(length)):
+				yield bucket[word_id], score
+
+
+	def __evaluate_length(self, length):
+		"""
+		Returns: The list of the scores of the length bucket words by word id
+		"""
+
+		word_index = self._word_index
+		strategy_name = self._strategy_name
+		max_incorrect = self._max_incorrect
+		all_known = (1 << length) - 1
+
+		letters = word_index.letters(length)
+		_, positions = word_index.masks(length)
+
+		scores = [None] * len(letters)
+
+		# groups of (word ids, guessed letters, wrong guesses, correct guesses, known positions)
+		groups = [(range(len(letters)), frozenset(), 0, 0, 0)]
+
+		while len(groups) > 0:
+			ids, guessed, wrong, correct, known = groups.pop()
+
+			# a single word left is guessed next, for free
+			if len(ids) == 1:
+				scores[ids[0]] = wrong + correct
+				continue
+
+			partition = lambda: HangmanPatternPartition.partition(letters, positions, \
+				ids, len(ids), guessed)
+
+			# the strategy's tally is rebuilt from the engine's, keep its letter ordering
+			tally = Counter() + HangmanLetterTally.count(letters, ids, guessed)
+
+			letter, _ = HangmanLetterStrategy.select_letter(tally, len(ids), \
+				strategy_name, partition)
+
+			letter_positions = positions[ord(letter) - HangmanWordIndex.LETTER_BASE]
+			guessed = guessed | frozenset(letter)
+
+			parts = {}
+
+			for word_id in ids:
+				revealed = letter_positions[word_id]
+
+				part = parts.get(revealed)
+
+				if part == None:
+					part = parts[revealed] = []
+
+				part.append(word_id)
+
+			for revealed, part in parts.iteritems():
+				if revealed == 0:
+					part_wrong, part_correct = wrong + 1, correct
+				else:
+					part_wrong, part_correct = wrong, correct + 1
+
+				if part_wrong > max_incorrect:
+					score = HangmanGame._SCORE_GAMELOST
+				elif known | revealed == all_known:
+					score = part_wrong + part_correct
+				else:
+					groups.append((part, guessed, part_wrong, part_correct, known | revealed))
+					continue
+
+				for word_id in part:
+					scores[word_id] = score
+
+		return scores
@@ -0,0 +1,245 @@
+import heapq
+import itertools
+import os
+import shutil
+import tempfile
+
+from HangmanWordIndex import HangmanWordIndex
+
+
+class HangmanDictionaryIngest:
+	"""
+	Streaming ingest of a raw word list into a clean dictionary file, for word
+	lists larger than memory.
+
+	Each line is normalized (stripped and lowercased) once, and validated: words
+	must be letters a to z, anything else is rejected (the rule of
+	HangmanWordIndex, which skips such words).  Duplicate words are
+	dropped, keeping the first.  The output holds one word per line, grouped by
+	word length in ascending order, each length keeping the input ordering of
+	its words, so the dictionary indexes (and plays) as the raw list would.
+
+	Both the dedupe and the grouping are external merge sorts of text records:
+	sorted runs of at most run_bytes are spilled to temporary files, then merged
+	at most _MERGE_FANIN runs at a time.  The two sorts are pipelined, so memory
+	stays bounded by about two runs whatever the input size.
+		dedupe - records 'word seq', the first record of each word is kept
+		grouping - records 'length seq word', written out in order
+
+	where seq is the zero padded input line number.
+
+	The dictionary is written to a temporary file beside it, renamed over the
+	dictionary file once complete: the raw list may be ingested in place, and
+	a failed ingest leaves any previous dictionary untouched.
+	"""
+
+	#number of runs merged at once, bounding the open files
+	_MERGE_FANIN = 64
+
+	#input lines between progress reports
+	_PROGRESS_LINES = 1 << 20
+
+	_SEQ_FORMAT = '{:012d}'
+	_LENGTH_FORMAT = '{:04d}'
+
+
+	def __init__(self, display, run_bytes = 64 << 20, tempdir = None):
+
+		self._display = display
+		self._run_bytes = run_bytes
+		self._tempdir = tempdir
+
+		self._lines = 0
+		self._rejected = 0
+		self._duplicates = 0
+		self._words = 0
+		self._runs = 0
+
+
+	def __str__(self):
+		return "{} lines, {} words, {} rejected, {} duplicates, {} sorted runs".format( \
+			self._lines, self._words, self._rejected, self._duplicates, self._runs)
+
+
+	@property
+	def words(self):
+		return self._words
+
+	@property
+	def rejected(self):
+		return self._rejected
+
+	@property
+	def duplicates(self):
+		return self._duplicates
+
+
+	def ingest(self, dictfile_name, name):
+		"""
+		Ingest the raw word list file into the dictionary file name
+		"""
+
+		# beside the dictionary file, so the rename stays on its file system
+		out_fd, out_name = tempfile.mkstemp(prefix='.hangman-ingest-', \
+			dir=os.path.dirname(os.path.abspath(name)))
+
+		out = os.fdopen(out_fd, 'wb')
+		workdir = None
+
+		try:
+			workdir = tempfile.mkdtemp(prefix='hangman-ingest-', dir=self._tempdir)
+
+			with open(dictfile_name, 'rb') as fd:
+				first_seen = self.__unique_words(self.__normalized_words(fd), workdir)
+
+				grouped = self.__sort((HangmanDictionaryIngest._LENGTH_FORMAT.format(len(word)) \
+					+ seq + ' ' + word for word, seq in first_seen), workdir)
+
+				with out:
+					for record in grouped:
+						out.write(record[record.index(' ') + 1:])
+						out.write('\n')
+
+						self._words += 1
+
+			# mkstemp files are private, the dictionary gets the usual permissions
+			umask = os.umask(0)
+			os.umask(umask)
+			os.chmod(out_name, 0666 & ~umask)
+
+			os.rename(out_name, name)
+
+		except:
+			out.close()
+			if os.path.exists(out_name): os.remove(out_name)
+			raise
+
+		finally:
+			if workdir != None: shutil.rmtree(workdir, ignore_errors=True)
+
+
+	def __normalized_words(self, fd):
+		"""
+		Generator function yielding the 'word seq' records of the valid words
+		"""
+
+		seq_format = HangmanDictionaryIngest._SEQ_FORMAT
+		invalid = HangmanWordIndex.INVALID
+		progress = HangmanDictionaryIngest._PROGRESS_LINES
+
+		for seq, line in enumerate(fd):
+			if seq % progress == 0 and seq > 0:
+				self._display.clock("Read {} lines", seq)
+
+			self._lines += 1
+
+			word = line.strip().lower()
+
+			if len(word) == 0: continue
+
+			if invalid.search(word) != None:
+				self._rejected += 1
+				continue
+
+			yield word + ' ' + seq_format.format(seq)
+
+
+	def __unique_words(self, records, workdir):
+		"""
+		Generator function yielding the (word, seq) of the first record of
+		each word
+		"""
+
+		last = None
+
+		for record in self.__sort(records, workdir):
+			word, seq = record.split(' ')
+
+			if word == last:
+				self._duplicates += 1
+				continue
+
+			last = word
+
+			yield word, seq
+
+
+	def __sort(self, records, workdir):
+		"""
+		Generator function yielding the records in sorted order, external merge
+		sort bounded by run_bytes
+		"""
+
+		runs = []
+		run = []
+		run_bytes = 0
+
+		for record in records:
+			run.append(record)
+			run_bytes += len(record) + 64
+
+			if run_bytes >= self._run_bytes:
+				runs.append(self.__spill(sorted(run), workdir))
+				run = []
+				run_bytes = 0
+
+		if len(runs) == 0:
+			# fits in memory, no spill
+			for record in sorted(run): yield record
+			return
+
+		if len(run) > 0:
+			runs.append(self.__spill(sorted(run), workdir))
+
+		run = None
+
+		fanin = HangmanDictionaryIngest._MERGE_FANIN
+
+		while len(runs) > fanin:
+			self._display.clock("Merging {} sorted runs", len(runs))
+
+			merged = []
+
+			for i in xrange(0, len(runs), fanin):
+				merged.append(self.__spill(self.__merge(runs[i:i + fanin]), workdir))
+
+			runs = merged
+
+		for record in self.__merge(runs): yield record
+
+
+	def __spill(self, records, workdir):
+		"""
+		Returns: The name of a new temporary run file holding the sorted records
+		"""
+
+		fd, name = tempfile.mkstemp(suffix='.run', dir=workdir)
+
+		with os.fdopen(fd, 'wb') as run:
+			for record in records:
+				run.write(record)
+				run.write('\n')
+
+		self._runs += 1
+
+		return name
+
+
+	@staticmethod
+	def __merge(names):
+		"""
+		Generator function yielding the merged records of the sorted run files,
+		deleting them once read
+		"""
+
+		fds = [open(name, 'rb') for name in names]
+
+		try:
+			streams = [itertools.imap(str.rstrip, fd) for fd in fds]
+
+			for record in heapq.merge(*streams): yield record
+
+		finally:
+			for fd, name in zip(fds, names):
+				fd.close()
+				os.remove(name)
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import threading
+
+from HangmanWordIndex import HangmanWordIndex
+from HangmanMappedWordIndex import HangmanMappedWordIndex
+from HangmanEngineContext import HangmanEngineContext
+
+
+class HangmanDictionaryRegistry:
+	"""
+	Registry of the dictionary contexts loaded in the process, so one process
+	can play games against many dictionaries.
+
+	Dictionaries are told apart by content hash: files with identical words
+	(copies, or a compiled dictionary and its source file) share one
+	HangmanEngineContext, hence one index, one set of per-length engine data
+	and one set of caches.  Each acquire or retain of a context takes a
+	reference, each release drops one; the context is freed (and a mapped
+	index unmapped) when its last reference is released.
+
+	The content hash of a file is remembered by path, size and modification
+	time, so acquiring a loaded dictionary again does not read its file.
+
+	All access is thread-safe.
+	"""
+
+	_default = None
+	_default_lock = threading.Lock()
+
+
+	def __init__(self):
+
+		self._lock = threading.Lock()
+
+		#(path, size, mtime) file keys to their content hash
+		self._hashes = {}
+
+		#content hash to [context, references]
+		self._entries = {}
+
+
+	@staticmethod
+	def default():
+		"""
+		Returns: The registry shared by the whole process
+		"""
+
+		with HangmanDictionaryRegistry._default_lock:
+			if HangmanDictionaryRegistry._default == None:
+				HangmanDictionaryRegistry._default = HangmanDictionaryRegistry()
+
+			return HangmanDictionaryRegistry._default
+
+
+	def __len__(self):
+		with self._lock:
+			return len(self._entries)
+
+
+	def acquire(self, name, cache_bytes):
+		"""
+		Take a reference to the dictionary context of the dictionary file,
+		loading the file unless a dictionary with the same content is loaded
+
+		Args:
+			name - dictionary file name, plain or compiled
+			cache_bytes - game state cache size of the context if loaded
+
+		Returns: The HangmanEngineContext, to be released when done
+		"""
+
+		stat = os.stat(name)
+		file_key = (os.path.realpath(name), stat.st_size, stat.st_mtime)
+
+		with self._lock:
+			content_hash = self._hashes.get(file_key)
+
+			if content_hash == None or content_hash not in self._entries:
+				word_index = None
+				data = None
+
+				if HangmanMappedWordIndex.is_compiled(name):
+					# mapping is cheap, the header holds the source content hash
+					word_index = HangmanMappedWordIndex(name)
+					content_hash = word_index.content_hash
+				else:
+					# read once, the same content builds the index unless loaded
+					with open(name, 'rb') as fd:
+						data = fd.read()
+
+					content_hash = hashlib.md5(data).hexdigest()
+
+				self._hashes[file_key] = content_hash
+
+				if content_hash in self._entries:
+					if word_index != None: word_index.close()
+
+				else:
+					if word_index == None:
+						word_index = HangmanWordIndex.from_content(data, content_hash)
+
+					self._entries[content_hash] = [HangmanEngineContext(word_index, cache_bytes), 0]
+
+			entry = self._entries[content_hash]
+			entry[1] += 1
+
+			return entry[0]
+
+
+	def retain(self, context):
+		"""
+		Take one more reference to an acquired dictionary context
+		"""
+
+		with self._lock:
+			self.__entry(context)[1] += 1
+
+
+	def release(self, context):
+		"""
+		Drop a reference to an acquired dictionary context, freeing it with the
+		last reference
+
+		Returns: True if the context was freed
+		"""
+
+		with self._lock:
+			entry = self.__entry(context)
+			entry[1] -= 1
+
+			if entry[1] > 0: return False
+
+			del self._entries[context.word_index.content_hash]
+
+		if isinstance(context.word_index, HangmanMappedWordIndex):
+			context.word_index.close()
+
+		return True
+
+
+	def references(self, context):
+		"""
+		Returns: The number of references held to the dictionary context,
+		0 once freed
+		"""
+
+		with self._lock:
+			entry = self._entries.get(context.word_index.content_hash)
+
+			return entry[1] if entry != None and entry[0] is context else 0
+
+
+	def __entry(self, context):
+
+		entry = self._entries.get(context.word_index.content_hash)
+
+		if entry == None or entry[0] is not context:
+			raise Exception("Dictionary context is not held by the registry")
+
+		return entry
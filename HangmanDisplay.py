@@ -1,12 +1,27 @@
+import atexit
+import sys
+import threading
+
 from HangmanClock import HangmanClock
 
 class HangmanDisplay:
 	""""
 	Class to handle display text modes wrt to game state and timing data
+
+	Messages may be given as a format string and its arguments, e.g.
+	display.chatty("letter is {}", letter), so they are only formatted
+	when their level is displayed.  A buffered display writes its lines
+	out in large blocks instead of one write per line, see flush.  Lines
+	and clock messages go to the out stream, stdout by default.
 	"""
 
 	_NONE, _SIMPLE, _NORMAL, _CHATTY = 0,1,2,3
 
+	_PREFIXES = {_NONE: '', _SIMPLE: '', _NORMAL: '[_] ', _CHATTY: '[H] '}
+
+	#buffered output is written out once it reaches this many characters
+	_BUFFER_SIZE = 1 << 16
+
 	@property 
 	def NONE(self): return HangmanDisplay._NONE
 	@property 
@@ -17,42 +32,98 @@ class HangmanDisplay:
 	def CHATTY(self): return HangmanDisplay._CHATTY
 
 
-	def __init__(self, verboselevel = _SIMPLE, clockflag = False):
+	def __init__(self, verboselevel = _SIMPLE, clockflag = False, tracer = None, buffered = False, out = None):
 		self._verboselevel = verboselevel
+		self._out = out if out != None else sys.stdout
 
 		if clockflag == True: 
-			self._clock = HangmanClock()
+			self._clock = HangmanClock(self._out)
 		else:
 			self._clock = None
 
+		#Span tracer of the game play, None when tracing is disabled
+		self._tracer = tracer
+
+		#Pending output lines and their length, None when unbuffered
+		self._buffer = [] if buffered else None
+		self._buffered = 0
+		self._lock = threading.Lock()
+
+		if buffered: atexit.register(self.flush)
+
+
+	@property
+	def tracer(self): return self._tracer
+
+	def set_tracer(self, tracer): self._tracer = tracer
+
+
+	#Wrapper functions, the level check comes first so filtered out messages cost a compare
+	def bare(self, msg, *args):
+		if self._verboselevel >= HangmanDisplay._NONE: self.__log(HangmanDisplay._NONE, msg, args)
+
+	def simple(self, msg, *args):
+		if self._verboselevel >= HangmanDisplay._SIMPLE: self.__log(HangmanDisplay._SIMPLE, msg, args)
+
+	def normal(self, msg, *args):
+		if self._verboselevel >= HangmanDisplay._NORMAL: self.__log(HangmanDisplay._NORMAL, msg, args)
 
-	#Wrapper functions
-	def bare(self, msg): self.__log(self.NONE, msg)
-	def simple(self, msg): self.__log(self.SIMPLE, msg)
-	def normal(self, msg): self.__log(self.NORMAL, msg)
-	def chatty(self, msg): self.__log(self.CHATTY, msg)
+	def chatty(self, msg, *args):
+		if self._verboselevel >= HangmanDisplay._CHATTY: self.__log(HangmanDisplay._CHATTY, msg, args)
 
-	#Main logging function
-	def __log(self, level, msg):
-		if self._verboselevel >= level:
-			
-			if level == self.SIMPLE:
-				print("{}".format(msg))
+	#Main logging function, formats the message with its arguments if any
+	def __log(self, level, msg, args):
+		if len(args) > 0: msg = msg.format(*args)
 
-			elif level == self.NORMAL:
-				print("[_] {}".format(msg))
+		line = "{}{}\n".format(HangmanDisplay._PREFIXES[level], msg)
 
-			elif level == self.CHATTY:
-				print("[H] {}".format(msg))
+		if self._buffer == None:
+			self._out.write(line)
+			return
 
-			elif level >= self.NONE:
-				print("{}".format(msg))
+		with self._lock:
+			self._buffer.append(line)
+			self._buffered += len(line)
+
+			if self._buffered >= HangmanDisplay._BUFFER_SIZE: self.__write_buffer()
+
+
+	def flush(self):
+		"""
+		Write out the buffered lines, e.g. before forking worker processes
+		or printing around the display
+		"""
+		if self._buffer == None: return
+
+		with self._lock:
+			self.__write_buffer()
+
+		self._out.flush()
+
+
+	def __write_buffer(self):
+		if len(self._buffer) > 0:
+			block = ''.join(self._buffer)
+
+			del self._buffer[:]
+			self._buffered = 0
+
+			self._out.write(block)
+
+	#Timing function that allows an output message, also traced as an instant event
+	#The message is formatted with its arguments only when clocked or traced
+	def clock(self, msg, *args):
+		if self._clock == None and self._tracer == None: return
+
+		if len(args) > 0: msg = msg.format(*args)
 
-	#Timing function that allows an output message
-	def clock(self, msg):
 		if self._clock != None: 
+				self.flush()
 				self._clock.timer(msg)
 
+		if self._tracer != None:
+				self._tracer.instant(msg)
+
 	#User convenience functions
 	def ischatty(self):
 		if self._verboselevel >= self.CHATTY: return True
@@ -66,7 +137,7 @@ if __name__ == "__main__":
 		display.clock("Start time")
 		display.simple("Here is a terse message")
 		display.normal("Here is a normal message")
-		display.chatty("Here is a verbose message")
+		display.chatty("Here is a {} message", "verbose")
 		display.clock("End time")
 
 		
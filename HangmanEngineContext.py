@@ -0,0 +1,134 @@
+import copy
+import threading
+
+from HangmanStateCache import HangmanStateCache
+
+
+class HangmanEngineContext:
+	"""
+	Dictionary context shared by the pass engines of every game played against
+	the same dictionary, possibly concurrently on several threads.
+
+	Holds the immutable shared data: the HangmanWordIndex and the per-length
+	data engines derive from it (built once on first use), along with the
+	caches shared across games: first pass tallies and reduced game states.
+	The mutable candidate word set of a game lives in its own engine instance.
+
+	All access is thread-safe.
+	"""
+
+	def __init__(self, word_index, cache_bytes):
+
+		self._word_index = word_index
+		self._lock = threading.Lock()
+
+		#This dict contains the (pass_size, counter) first pass tallies
+		#of the word length arranged word sets
+		self._letter_counters = {}
+
+		#First guess letters of the word lengths, when known ahead of the games
+		self._first_guesses = {}
+
+		#Engine specific per-length data, see shared
+		self._shared = {}
+
+		self._state_cache = HangmanStateCache(cache_bytes)
+
+		#Worker processes sharing large reduces, see HangmanShardPool
+		self._shard_pool = None
+
+
+	@property
+	def word_index(self):
+		return self._word_index
+
+
+	@property
+	def state_cache(self):
+		"""
+		Returns: The reduced game state cache shared across games
+		"""
+		return self._state_cache
+
+
+	@property
+	def shard_pool(self):
+		"""
+		Returns: The HangmanShardPool reducing the large word sets, None if
+		every reduce runs in process
+		"""
+		return self._shard_pool
+
+	def set_shard_pool(self, shard_pool):
+		self._shard_pool = shard_pool
+
+
+	def bucket(self, length):
+		return self._word_index.bucket(length)
+
+
+	def masks(self, length):
+		return self._word_index.masks(length)
+
+
+	def letters(self, length):
+		return self._word_index.letters(length)
+
+
+	def postings(self, length):
+		return self._word_index.postings(length)
+
+
+	def shared(self, key, builder):
+		"""
+		Returns: The shared data stored under key, calling builder() to
+		build it the first time
+		"""
+
+		data = self._shared.get(key)
+
+		if data is not None: return data
+
+		with self._lock:
+			data = self._shared.get(key)
+
+			if data is None:
+				data = self._shared[key] = builder()
+
+		return data
+
+
+	def letter_counts(self, length):
+		"""
+		Returns: (pass_size, counter) tuple with a private copy of the cached
+		first pass counter for the given word length, or None if not tallied yet
+		"""
+
+		with self._lock:
+			counter_tuple = self._letter_counters.get(length)
+
+			if counter_tuple == None: return None
+
+			pass_size, counter = counter_tuple
+
+			return (pass_size, copy.deepcopy(counter))
+
+
+	def cache_letter_counts(self, length, pass_size, tally, first_guess = None):
+		"""
+		Store a copy of the first pass tally for the given word length,
+		along with the first guess letter it leads to if known
+		"""
+
+		with self._lock:
+			self._letter_counters[length] = (pass_size, copy.deepcopy(tally))
+
+			if first_guess != None: self._first_guesses[length] = first_guess
+
+
+	def first_guess(self, length):
+		"""
+		Returns: The first guess letter for the given word length,
+		or None if not known ahead of the games
+		"""
+		return self._first_guesses.get(length)
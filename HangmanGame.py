@@ -7,6 +7,9 @@ class HangmanGame:
 
 	_STATUS = {0:'GAME_WON', 1:'GAME_LOST', 2:'KEEP_GUESSING'}
 
+	#The score of a lost game
+	_SCORE_GAMELOST = 25
+
 	#A marker for the letters in the secret words that have not
 	#been guessed yet
 	_MYSTERY_LETTER = '-'
@@ -99,7 +102,7 @@ class HangmanGame:
 		"""
 
 		if self.game_status() == HangmanGame._STATUS_GAMELOST:
-			return 25
+			return HangmanGame._SCORE_GAMELOST
 		else:
 			return self.num_wrong_guesses_made() + \
 				len(self._correctly_guessed_letters)
@@ -0,0 +1,121 @@
+import sys
+
+from collections import Counter
+
+from Guess import GuessLetter
+from Guess import GuessWord
+from HangmanGame import HangmanGame
+from HangmanIndexPassEngine import HangmanIndexPassEngine
+from HangmanLetterStrategy import HangmanLetterStrategy
+from HangmanStateCache import HangmanStateCache
+
+
+class HangmanGuessAdvisor:
+	"""
+	Stateless next guess suggestions for arbitrary game states.
+
+	A game state is given as the word length, the hangman pattern revealed so
+	far and the letters and words guessed wrong; no HangmanGame and no earlier
+	turns are needed.  The candidate words are matched straight from the
+	dictionary's posting lists (see HangmanIndexPassEngine.match) and the
+	letter strategy replayed on them (see HangmanLetterStrategy.select_letter),
+	so the suggestion is the guess a game reaching that state would make.
+
+	Suggestions are memoized per state in a bounded least recently used cache.
+	Thread-safe, the dictionary context is only read.
+	"""
+
+	#estimated bytes of a cached suggestion besides its key
+	_ENTRY_BYTES = 200
+
+	def __init__(self, settings, context, strategy_name = None, cache_bytes = 16 << 20):
+
+		if strategy_name == None: strategy_name = settings.strategy
+
+		if strategy_name not in HangmanLetterStrategy.strategy_names():
+			raise Exception("Unknown letter strategy: " + strategy_name)
+
+		self._settings = settings
+		self._context = context
+		self._strategy_name = strategy_name
+		self._cache = HangmanStateCache(cache_bytes)
+
+
+	@property
+	def cache(self):
+		return self._cache
+
+
+	def suggest(self, length, hangman_pattern, wrong_letters = (), wrong_words = ()):
+		"""
+		Suggest the next guess of a game state
+
+		Args:
+			length - the secret word length
+			hangman_pattern - the letters guessed so far, '-' in place of unknown
+				letters e.g. '--e--e-'
+			wrong_letters - letters guessed wrong, e.g. 'st'
+			wrong_words - words guessed wrong
+
+		Returns:
+			guess - GuessLetter or GuessWord, None when no dictionary word fits
+			candidates - number of dictionary words fitting the game state
+		"""
+
+		hangman_pattern = hangman_pattern.lower()
+		wrong_letters = ''.join(sorted(set(letter.lower() for letter in wrong_letters)))
+		wrong_words = tuple(sorted(set(word.lower() for word in wrong_words)))
+
+		key = (self._strategy_name, length, hangman_pattern, wrong_letters, wrong_words)
+
+		cached = self._cache.get(key)
+
+		if cached != None: return cached
+
+		HangmanGuessAdvisor.__validate(length, hangman_pattern, wrong_letters, wrong_words)
+
+		engine = HangmanIndexPassEngine(length, self._settings, HangmanGame._MYSTERY_LETTER, self._context)
+
+		tally, pass_size, last_word = engine.match(hangman_pattern, wrong_letters, wrong_words)
+
+		if pass_size == 0:
+			guess = None
+		elif pass_size == 1:
+			guess = GuessWord(last_word)
+		else:
+			exclusion = set(hangman_pattern) | set(wrong_letters)
+
+			# the strategy's tally is rebuilt from the engine's, keep its letter ordering
+			letter, _ = HangmanLetterStrategy.select_letter(Counter() + tally, pass_size, \
+				self._strategy_name, lambda: engine.partition(exclusion))
+
+			guess = GuessLetter(letter)
+
+		suggestion = (guess, pass_size)
+
+		self._cache.put(key, suggestion, sys.getsizeof(key) + HangmanGuessAdvisor._ENTRY_BYTES)
+
+		return suggestion
+
+
+	@staticmethod
+	def __validate(length, hangman_pattern, wrong_letters, wrong_words):
+
+		if len(hangman_pattern) != length:
+			raise Exception("Pattern {} is not {} letters long".format(hangman_pattern, length))
+
+		for letter in hangman_pattern:
+			if letter != HangmanGame._MYSTERY_LETTER and not 'a' <= letter <= 'z':
+				raise Exception("Pattern {} must be letters a to z or -".format(hangman_pattern))
+
+		for letter in wrong_letters:
+			if not 'a' <= letter <= 'z':
+				raise Exception("Wrong letters must be letters a to z, not {}".format(letter))
+
+		for letter in wrong_letters:
+			if letter in hangman_pattern:
+				raise Exception("Wrong letter {} is in the pattern {}".format(letter, hangman_pattern))
+
+		for word in wrong_words:
+			if not word.isalpha():
+				raise Exception("Wrong word {} must be letters a to z".format(word))
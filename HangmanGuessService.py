@@ -0,0 +1,410 @@
+import asynchat
+import asyncore
+import itertools
+import json
+import socket
+
+from collections import OrderedDict
+
+from Guess import GuessWord
+from HangmanGame import HangmanGame
+from HangmanRemoteGame import HangmanRemoteGame
+from HangmanGuessAdvisor import HangmanGuessAdvisor
+from HangmanLetterStrategy import HangmanLetterStrategy
+from HangmanDictionaryRegistry import HangmanDictionaryRegistry
+from HangmanTallyCache import HangmanTallyCache
+
+
+class HangmanGuessService:
+	"""
+	Guess suggestion service, playing hangman games whose secret words are
+	held by the clients.
+
+	A session is a HangmanRemoteGame and its HangmanLetterStrategy, kept in
+	memory between requests.  All the sessions of a dictionary share its
+	dictionary context (index, per-length engine data, first pass tallies and
+	game state cache) loaded once.  Sessions are evicted least recently used
+	beyond max_sessions.
+
+	Further dictionaries are loaded and unloaded by name at run time through
+	the dictionary registry, which shares the context of identical dictionary
+	files.  Requests name their dictionary, the default one (given at
+	construction) otherwise.  The service and each session hold a reference
+	to their dictionary context, so an unloaded dictionary is freed once its
+	last session ends.
+
+	Sessions live as long as their clients keep them, so the service takes
+	the in memory pass engines only (ENGINES): the file engine holds two pass
+	files open per game and would run out of file descriptors.
+
+	Requests and responses are JSON objects, one per line over TCP (see
+	HangmanGuessServer):
+
+		{"op": "start", "length": 7, "dictionary": "words_big.txt"}
+		{"op": "reveal", "session": 1, "pattern": "--E--E-"}
+		{"op": "end", "session": 1}
+		{"op": "suggest", "length": 7, "pattern": "--e--e-", "wrong_letters": "st", "wrong_words": []}
+		{"op": "stats"}
+		{"op": "load", "dictionary": "customer.txt"}
+		{"op": "unload", "dictionary": "customer.txt"}
+
+	start and reveal answer with the session's next guess, or its final status
+	once the game is over:
+
+		{"session": 1, "guess": "r", "kind": "letter", "candidates": 120,
+			"score": 2, "status": "KEEP_GUESSING"}
+
+	suggest answers the next guess of any game state without a session, see
+	HangmanGuessAdvisor.  Failed requests answer {"error": "..."}.
+	"""
+
+	#pass engines keeping no open file per session
+	ENGINES = ['memory', 'numpy', 'index']
+
+
+	def __init__(self, settings, context, max_sessions = 10000, registry = None):
+		"""
+		Args:
+			settings - HangmanSettings, the default dictionary file name is
+				the settings' one
+			context - the default dictionary context, acquired from the registry
+			max_sessions - number of sessions kept
+			registry - HangmanDictionaryRegistry, the process one by default
+		"""
+
+		if settings.engine not in HangmanGuessService.ENGINES:
+			raise Exception("Guess service engine must be one of {}: {}".format( \
+				', '.join(HangmanGuessService.ENGINES), settings.engine))
+
+		if registry == None: registry = HangmanDictionaryRegistry.default()
+
+		self._settings = settings
+		self._registry = registry
+		self._max_sessions = max_sessions
+
+		#dictionary names to their (context, advisor)
+		self._dictionaries = {}
+		self._default_name = settings.get_dictfile_name()
+
+		#session ids to their (game, strategy, context)
+		self._sessions = OrderedDict()
+		self._session_ids = itertools.count(1)
+
+		self.requests = 0
+
+		self._ops = {'start': self.__start, 'reveal': self.__reveal, \
+			'end': self.__end, 'suggest': self.__suggest, 'stats': self.__stats, \
+			'load': self.__load, 'unload': self.__unload}
+
+		registry.retain(context)
+		self.__add_dictionary(self._default_name, context)
+
+
+	def load(self, name):
+		"""
+		Load the dictionary file, sharing the context of a loaded dictionary
+		with the same content
+
+		Returns: The dictionary context
+		"""
+
+		if name in self._dictionaries:
+			return self._dictionaries[name][0]
+
+		context = self._registry.acquire(name, self._settings.cache_bytes)
+
+		try:
+			tally_cachefile = self._settings.get_tally_cachefile(name)
+
+			if tally_cachefile != None:
+				tally_cache = HangmanTallyCache(tally_cachefile)
+
+				if tally_cache.load(context) == False:
+					tally_cache.build(context)
+					tally_cache.save(context)
+
+			self.__add_dictionary(name, context)
+
+		except:
+			self._registry.release(context)
+			raise
+
+		return context
+
+
+	def unload(self, name):
+		"""
+		Drop the service's reference to the dictionary, its context is freed
+		once its sessions end too
+
+		Returns: True if the dictionary context was freed
+		"""
+
+		context, _ = self.__dictionary(name)
+		del self._dictionaries[name]
+
+		return self._registry.release(context)
+
+
+	def close(self):
+		"""
+		End every session and unload every dictionary
+		"""
+
+		for session_id in self._sessions.keys():
+			self.__close(session_id)
+
+		for name in self._dictionaries.keys():
+			self.unload(name)
+
+
+	def handle_line(self, line):
+		"""
+		Returns: The JSON response line (without line end) to the JSON request line
+		"""
+
+		self.requests += 1
+
+		try:
+			request = json.loads(line)
+
+			op = self._ops.get(request.get('op'))
+
+			if op == None:
+				raise Exception("Unknown op: {}".format(request.get('op')))
+
+			response = op(request)
+
+		except Exception as e:
+			response = {'error': str(e)}
+
+		return json.dumps(response, separators=(',', ':'))
+
+
+	def __start(self, request):
+
+		length = int(request['length'])
+
+		if length <= 0:
+			raise Exception("Word length must be positive, not {}".format(length))
+
+		context, _ = self.__dictionary(request.get('dictionary', self._default_name))
+
+		game = HangmanRemoteGame(length, self._settings.max_incorrect)
+		strategy = HangmanLetterStrategy(game, self._settings, context)
+
+		self._registry.retain(context)
+
+		session_id = next(self._session_ids)
+		self._sessions[session_id] = (game, strategy, context)
+
+		while len(self._sessions) > self._max_sessions:
+			self.__close(next(iter(self._sessions)))
+
+		return self.__next_guess(session_id, game, strategy)
+
+
+	def __reveal(self, request):
+
+		session_id = request['session']
+		game, strategy, _ = self.__session(session_id)
+
+		game.reveal(request['pattern'])
+
+		return self.__next_guess(session_id, game, strategy)
+
+
+	def __end(self, request):
+
+		session_id = request['session']
+		self.__session(session_id)
+		self.__close(session_id)
+
+		return {'session': session_id, 'status': 'ENDED'}
+
+
+	def __suggest(self, request):
+
+		_, advisor = self.__dictionary(request.get('dictionary', self._default_name))
+
+		guess, candidates = advisor.suggest(int(request['length']), request['pattern'], \
+			request.get('wrong_letters', ''), request.get('wrong_words', []))
+
+		response = {'candidates': candidates}
+
+		if guess != None:
+			response['guess'] = guess.guess
+			response['kind'] = 'word' if isinstance(guess, GuessWord) else 'letter'
+
+		return response
+
+
+	def __stats(self, request):
+
+		dictionaries = {}
+
+		for name, (context, advisor) in self._dictionaries.iteritems():
+			dictionaries[name] = {'words': len(context.word_index), \
+				'content_hash': context.word_index.content_hash, \
+				'references': self._registry.references(context), \
+				'state_cache': str(context.state_cache), 'suggest_cache': str(advisor.cache)}
+
+		return {'sessions': len(self._sessions), 'requests': self.requests, \
+			'contexts': len(self._registry), 'dictionaries': dictionaries}
+
+
+	def __load(self, request):
+
+		name = request['dictionary']
+		context = self.load(name)
+
+		return {'dictionary': name, 'words': len(context.word_index), \
+			'content_hash': context.word_index.content_hash, \
+			'references': self._registry.references(context)}
+
+
+	def __unload(self, request):
+
+		name = request['dictionary']
+
+		return {'dictionary': name, 'freed': self.unload(name)}
+
+
+	def __add_dictionary(self, name, context):
+
+		HangmanLetterStrategy.prepare_engine(self._settings, context)
+
+		self._dictionaries[name] = (context, HangmanGuessAdvisor(self._settings, context))
+
+
+	def __dictionary(self, name):
+		"""
+		Returns: The (context, advisor) of the loaded dictionary
+		"""
+
+		dictionary = self._dictionaries.get(name)
+
+		if dictionary == None:
+			raise Exception("Unknown dictionary: {}".format(name))
+
+		return dictionary
+
+
+	def __session(self, session_id):
+		"""
+		Returns: The (game, strategy, context) of the session, marked most recently used
+		"""
+
+		session = self._sessions.pop(session_id, None)
+
+		if session == None:
+			raise Exception("Unknown session: {}".format(session_id))
+
+		self._sessions[session_id] = session
+
+		return session
+
+
+	def __close(self, session_id):
+
+		_, strategy, context = self._sessions.pop(session_id)
+		strategy.close()
+
+		self._registry.release(context)
+
+
+	def __next_guess(self, session_id, game, strategy):
+		"""
+		Returns: The response with the next guess of the session, or its final
+		status closing it once the game is over
+		"""
+
+		response = {'session': session_id}
+
+		status = game.game_status()
+
+		if status == game.status_keep_guessing:
+			guess, error = strategy.next_guess(game)
+
+			if guess == None:
+				response['error'] = error
+				status = HangmanGame._STATUS_GAMELOST
+			else:
+				guess.make_guess(game)
+
+				response['guess'] = guess.guess
+				response['kind'] = 'word' if isinstance(guess, GuessWord) else 'letter'
+				response['candidates'] = strategy.pass_size
+
+		response['score'] = game.current_score()
+		response['status'] = HangmanGame._STATUS[status]
+
+		if status != game.status_keep_guessing: self.__close(session_id)
+
+		return response
+
+
+
+class HangmanGuessServer(asyncore.dispatcher):
+	"""
+	Line protocol TCP server of a HangmanGuessService, one asyncore event loop
+	serving every connection from a single thread
+	"""
+
+	def __init__(self, service, host, port):
+
+		asyncore.dispatcher.__init__(self)
+
+		self._service = service
+
+		self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+		self.set_reuse_addr()
+		self.bind((host, port))
+		self.listen(128)
+
+
+	@property
+	def address(self):
+		return self.socket.getsockname()
+
+
+	def handle_accept(self):
+
+		pair = self.accept()
+
+		if pair != None:
+			sock, _ = pair
+			_HangmanGuessChannel(sock, self._service)
+
+
+	def serve(self):
+		asyncore.loop(use_poll=True)
+
+
+
+class _HangmanGuessChannel(asynchat.async_chat):
+	"""
+	Connection of a HangmanGuessServer client, answers each request line
+	"""
+
+	def __init__(self, sock, service):
+
+		asynchat.async_chat.__init__(self, sock)
+
+		self._service = service
+		self._received = []
+
+		self.set_terminator('\n')
+
+
+	def collect_incoming_data(self, data):
+		self._received.append(data)
+
+
+	def found_terminator(self):
+
+		line = ''.join(self._received)
+		self._received = []
+
+		if len(line.strip()) > 0:
+			self.push(self._service.handle_line(line) + '\n')
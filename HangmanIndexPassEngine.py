@@ -0,0 +1,304 @@
+from collections import Counter
+
+from HangmanWordIndex import HangmanWordIndex
+
+
+class HangmanIndexPassEngine:
+	"""
+	Inverted index variant of HangmanWordPassEngine.
+
+	The current possible hangman word set is an integer bitset over the word ids
+	of the length bucket.  Reductions intersect it with the (position, letter)
+	and letter posting lists of HangmanWordIndex instead of scanning every
+	candidate word:
+		wrong guess - subtract the words containing the letter
+		correct guess - intersect the words with the letter at each revealed
+			position, subtract those with it at any other position
+
+	The tally is one intersection and bit count per letter.
+
+	Exposes the same setup/set_pass_params/reduce contract as HangmanWordPassEngine
+	and is used exclusively by HangmanLetterStrategy.
+	"""
+
+	def __init__(self, answer_length, settings, mystery_letter, context):
+
+		self._settings = settings
+		self._display = settings.display
+		self._answer_length = answer_length
+		self._mystery_letter = mystery_letter
+		self._current_pass_params = None
+		self._context = context
+
+		self._bucket = context.bucket(answer_length)
+		self._containing, self._at = context.postings(answer_length)
+
+		self._candidates = 0
+
+
+	def __del__(self):
+
+		self._display = None
+		self._settings = None
+		self._context = None
+		self._bucket = None
+		self._containing = None
+		self._at = None
+
+
+	@staticmethod
+	def prepare(context, length):
+		"""
+		Build the shared per-length data used by the engine ahead of the games
+		"""
+		context.postings(length)
+
+
+	def setup(self, letter_strategy):
+		"""
+		Setup the engine. Initialize word set and counter structures to accurately
+			reflect current word set and tally data
+		Args: self, strategy
+		Returns: Nothing
+		"""
+
+		self._display.chatty("Entering setup")
+
+		# first pass is every word in the length bucket
+		self._candidates = (1 << len(self._bucket)) - 1
+
+		counter_tuple = self._context.letter_counts(self._answer_length)
+
+		if counter_tuple != None:
+			pass_size, counter = counter_tuple
+			letter_strategy.set_letter_counts(pass_size, counter)
+
+		else:
+			tally, pass_size, _ = self.__tally(set())
+
+			letter_strategy.set_letter_counts(pass_size, tally)
+
+			self._context.cache_letter_counts(self._answer_length, pass_size, tally)
+
+		self._display.chatty("Finished setup")
+
+
+	def close(self):
+		"""
+		Nothing to release, the word set is dropped along with the engine
+		"""
+		pass
+
+
+	def set_pass_params(self, pass_params_tuple_vector):
+		"""
+		Same input tuple vector format as HangmanWordPassEngine.set_pass_params
+		(last_guess_correct, letter, hangman_pattern, predicate, revealed, exclusion)
+		"""
+
+		self._current_pass_params = pass_params_tuple_vector
+
+
+	def reduce(self):
+		"""
+		Reduce the word set space,	update the unique map of letter/counts
+		given the new word set universe
+
+		Returns tuple w/ updated state
+		"""
+
+		last_guess_correct, guess, hangman_pattern, predicate, revealed, exclusion \
+			 = self._current_pass_params
+
+		assert(last_guess_correct != None and guess != None and exclusion != None \
+			and hangman_pattern != None and predicate != None and revealed != None)
+
+		code = ord(guess) - HangmanWordIndex.LETTER_BASE
+
+		tracer = self._display.tracer
+
+		if tracer != None: start = tracer.now()
+
+		candidates = self._candidates
+
+		if last_guess_correct:
+			for position in xrange(self._answer_length):
+				if revealed & (1 << position):
+					candidates &= self._at[position][code]
+				else:
+					candidates &= ~self._at[position][code]
+		else:
+			candidates &= ~self._containing[code]
+
+		if tracer != None:
+			tracer.complete('filter', start, {'in': HangmanIndexPassEngine.__bit_count(self._candidates), \
+				'out': HangmanIndexPassEngine.__bit_count(candidates)})
+			start = tracer.now()
+
+		self._candidates = candidates
+
+		updated_state_tuple = self.__tally(exclusion)
+
+		if tracer != None: tracer.complete('tally', start, {'words': updated_state_tuple[1]})
+
+		return updated_state_tuple
+
+
+	def match(self, hangman_pattern, wrong_letters, wrong_words):
+		"""
+		Set the word set to the bucket words fitting a game state directly,
+		without replaying its guesses
+
+		Args:
+			hangman_pattern - the letters guessed so far, the mystery letter
+				in place of unknown letters e.g. '--e--e-'
+			wrong_letters - letters guessed wrong
+			wrong_words - words guessed wrong
+
+		Returns: (tally, pass_size, last_word) tuple as reduce, the tally
+		ignoring the pattern letters and wrong letters
+		"""
+
+		base = HangmanWordIndex.LETTER_BASE
+
+		candidates = (1 << len(self._bucket)) - 1
+
+		revealed = set(letter for letter in hangman_pattern if letter != self._mystery_letter)
+
+		for letter in revealed:
+			code = ord(letter) - base
+
+			for position in xrange(self._answer_length):
+				if hangman_pattern[position] == letter:
+					candidates &= self._at[position][code]
+				else:
+					candidates &= ~self._at[position][code]
+
+		for letter in wrong_letters:
+			candidates &= ~self._containing[ord(letter) - base]
+
+		for word in wrong_words:
+			if len(word) != self._answer_length: continue
+
+			# the word's bitset is the intersection of its letters at their positions
+			same = candidates
+
+			for position, letter in enumerate(word):
+				same &= self._at[position][ord(letter) - base]
+
+			candidates &= ~same
+
+		self._candidates = candidates
+
+		return self.__tally(revealed | set(wrong_letters))
+
+
+	def partition(self, exclusion):
+		"""
+		Returns: The block sizes each letter not in the exclusion set would
+		split the current word set into, the block of words without the letter
+		last.  The words containing a letter are split position by position
+		with posting list intersections, no word is visited
+		"""
+
+		candidates = self._candidates
+		base = HangmanWordIndex.LETTER_BASE
+
+		pass_size = HangmanIndexPassEngine.__bit_count(candidates)
+
+		blocks = {}
+
+		for code in xrange(26):
+			letter = chr(code + base)
+
+			if letter in exclusion: continue
+
+			matches = candidates & self._containing[code]
+
+			if matches == 0: continue
+
+			parts = [matches]
+
+			for position in xrange(self._answer_length):
+				at = self._at[position][code]
+				split = []
+
+				for part in parts:
+					hit = part & at
+
+					if hit != 0: split.append(hit)
+					if hit != part: split.append(part ^ hit)
+
+				parts = split
+
+			sizes = [HangmanIndexPassEngine.__bit_count(part) for part in parts]
+
+			absent = pass_size - sum(sizes)
+
+			if absent > 0: sizes.append(absent)
+
+			blocks[letter] = sizes
+
+		return blocks
+
+
+	def snapshot(self):
+		"""
+		Returns: The current word set bitset (immutable, shared as is)
+		"""
+		return self._candidates
+
+
+	def restore(self, snapshot):
+		"""
+		Reset the current word set to a snapshot taken after a reduce
+		"""
+		self._candidates = snapshot
+
+
+	def __tally(self, exclusion):
+		"""
+		Tally the unique word letters of the current word set, one posting list
+		intersection per letter, ignoring the letters found in the exclusion set
+		"""
+
+		candidates = self._candidates
+		base = HangmanWordIndex.LETTER_BASE
+
+		pass_size = HangmanIndexPassEngine.__bit_count(candidates)
+
+		order = []
+
+		for code in xrange(26):
+			letter = chr(code + base)
+
+			if letter in exclusion: continue
+
+			matches = candidates & self._containing[code]
+
+			if matches == 0: continue
+
+			# lowest word id containing the letter, the streaming tally sees it first
+			first_id = (matches & -matches).bit_length() - 1
+			first_position = self._bucket[first_id].index(letter)
+
+			order.append((first_id, first_position, letter, HangmanIndexPassEngine.__bit_count(matches)))
+
+		# insert letters in first seen order so tie breaks match the streaming tally
+		order.sort()
+
+		tally = Counter()
+
+		for _, _, letter, count in order:
+			tally[letter] = count
+
+		last_word = None
+
+		if pass_size == 1: last_word = self._bucket[candidates.bit_length() - 1]
+
+		return (tally, pass_size, last_word)
+
+
+	@staticmethod
+	def __bit_count(bitset):
+		return bin(bitset).count('1')
@@ -1,8 +1,14 @@
-import re
+import math
+import sys
+
 from collections import Counter
 from random import randint
 
 from HangmanWordPassEngine import HangmanWordPassEngine
+from HangmanMemoryPassEngine import HangmanMemoryPassEngine
+from HangmanNumpyPassEngine import HangmanNumpyPassEngine
+from HangmanIndexPassEngine import HangmanIndexPassEngine
+from HangmanPatternPredicate import HangmanPatternPredicate
 from Guess import GuessLetter
 from Guess import GuessWord
 
@@ -31,9 +37,15 @@ class HangmanLetterStrategy:
 
 	_top_threshhold = 2
 
-	def __init__(self, game, settings):
+	#Pass engine backends selectable through the settings
+	_engines = {'file':HangmanWordPassEngine, 'memory':HangmanMemoryPassEngine,
+		'numpy':HangmanNumpyPassEngine, 'index':HangmanIndexPassEngine}
+
+	def __init__(self, game, settings, context, strategy_name = None):
 		"""
 		Initialize the strategy given the length of the secret hangman word 
+		and the dictionary context shared with the other games.
+		The letter selection strategy defaults to the one of the settings
 		"""
 
 		self._mystery_letter = game.mystery_letter
@@ -50,13 +62,64 @@ class HangmanLetterStrategy:
 
 		self._last_word = None
 		self._guessed_last_word = False
+		self._hangman_pattern = None
+
+		self._engine_name = settings.engine
+		self._answer_length = game.get_secret_word_length()
+
+		#Reduced game states shared across games, keyed by
+		#(engine, word length, hangman pattern, sorted guessed letters)
+		self._state_cache = context.state_cache
+
+		#Letter selection, see _strategies
+		if strategy_name == None: strategy_name = settings.strategy
+
+		if strategy_name not in HangmanLetterStrategy._strategies:
+			raise Exception("Unknown letter strategy: " + strategy_name)
+
+		self._selection = strategy_name
+
+		#First guess letter of the word length when known ahead of the games,
+		#cached for the hybrid letter selection only
+		self._first_guess = None
 
-		#Initialize the HangmanWordPassEngine with the secret word length
-		self._engine = HangmanWordPassEngine(game.get_secret_word_length(), \
-				settings, self._mystery_letter)
+		if self._selection == 'hybrid':
+			self._first_guess = context.first_guess(self._answer_length)
+
+		#Initialize the selected pass engine with the secret word length
+		engine_class = HangmanLetterStrategy._engines[settings.engine]
+
+		self._engine = engine_class(game.get_secret_word_length(), \
+				settings, self._mystery_letter, context)
+
+		#Span tracer, None unless tracing or benchmarking
+		self._tracer = settings.display.tracer
+
+		tracer = self._tracer
+
+		if tracer != None: start = tracer.now()
 
 		self._engine.setup(self)
 
+		if tracer != None:
+			tracer.complete('setup', start, {'length': self._answer_length, \
+				'engine': self._engine_name})
+
+
+	def close(self):
+		"""
+		Release the engine resources once the game is over
+		"""
+		self._engine.close()
+
+
+	@property
+	def pass_size(self):
+		"""
+		Returns: The number of words in the current possible hangman word set
+		"""
+		return self._current_pass_size
+
 
 	def __del__(self):
 
@@ -84,48 +147,36 @@ class HangmanLetterStrategy:
 
 		guess, error = None, None
 
-		repat = None
-
 		#We've had one guess already -- update engine state with this info before choosing next guess
 		if game.current_score() > 0:  
 
 			hangman_pattern = game.get_guessed_so_far().lower()
 			last_guess_correct = self.__check_last_guess(game)
 
-			# Create a counter object for current state of correct hangman letters
-			# Make sure we don't track mystery display letters
-			hangman_tally = Counter(hangman_pattern)
-			del hangman_tally[self._mystery_letter]
-
-			# Create string representation of set
-			exclude_str = ''.join(str(x) for x in self._guessed_letters)
-
-			# For each mystery_letter replace it with [^characters already guessed]
-			repat = '^' + hangman_pattern.replace(self._mystery_letter, '[^' + exclude_str + ']') + "$"
-
-			regex = re.compile(repat)
-	
 			# If the last guess was a letter, update the engine state accordingly
 			if len(self._last_guess) == 1:
 
+				# Game state compiled into the engine word filter, once per state across games
+				predicate = HangmanPatternPredicate.compile(hangman_pattern, self._last_guess, \
+					self._guessed_letters, self._mystery_letter)
+
 				# Use for filtering sequence
 				pass_params_tuple_vector = (last_guess_correct, self._last_guess, \
-					hangman_pattern, hangman_tally, regex, self._guessed_letters)
-
-				self._engine.set_pass_params(pass_params_tuple_vector)
+					hangman_pattern, predicate, predicate.revealed, self._guessed_letters)
 
-				# Reduce the engine word set
-				tally, pass_size, self._last_word = self._engine.reduce()
+				# Reduce the engine word set, unless an earlier game reached the same state
+				tally, pass_size, self._last_word = \
+					self.__reduce(hangman_pattern, pass_params_tuple_vector)
 
 				# Record the counts
 				self.set_letter_counts(pass_size, tally)
 
 		if self._display.ischatty():
 			guessed = game.get_guessed_so_far()
-			self._display.chatty("All guessed letters so far are {}".format(guessed))
-			#self._display.chatty('regex pattern: {}'.format(repat))
+			self._display.chatty("All guessed letters so far are {}", guessed)
 
 		pass_size = self._current_pass_size
+		self._hangman_pattern = game.get_guessed_so_far().lower()
 
 		if pass_size == 0: 
 			error = "Game over, exhausted all words, word not in dictionary"
@@ -144,11 +195,15 @@ class HangmanLetterStrategy:
 		# most of the game play is where the pass size hasn't dwindled down to 0 or 1
 		else:
 			tally = self._letter_counts
-			letter = self.__get_letter(tally, pass_size)
+
+			if game.current_score() == 0 and self._first_guess != None:
+				letter = self._first_guess
+			else:
+				letter = self.__get_letter(tally, pass_size)
 
 			if self._display.ischatty():
-				self._display.chatty("letter counts are {}".format(tally))
-				self._display.chatty("guess character is {}".format(letter))
+				self._display.chatty("letter counts are {}", tally)
+				self._display.chatty("guess character is {}", letter)
 
 			if letter != None:
 				guess = GuessLetter(letter)
@@ -161,6 +216,63 @@ class HangmanLetterStrategy:
 		
 		return guess, error
 
+	def __reduce(self, hangman_pattern, pass_params_tuple_vector):
+		"""
+		Reduce the engine word set given the pass params.  The strategy is
+		deterministic so games reaching the same canonical state share the
+		same reduced word set and tally, look those up in the state cache first
+
+		Returns:
+			(tally, pass_size, last_word) tuple as returned by the engine reduce
+		"""
+
+		cache = self._state_cache
+
+		key = (self._engine_name, self._answer_length, hangman_pattern, \
+			''.join(sorted(self._guessed_letters)))
+
+		cached = cache.get(key)
+
+		if cached != None:
+			snapshot, tally, pass_size, last_word = cached
+			self._engine.restore(snapshot)
+
+			return tally, pass_size, last_word
+
+		self._engine.set_pass_params(pass_params_tuple_vector)
+
+		tracer = self._tracer
+
+		if tracer != None: start = tracer.now()
+
+		tally, pass_size, last_word = self._engine.reduce()
+
+		if tracer != None:
+			tracer.complete('reduce', start, {'pattern': hangman_pattern, \
+				'in': self._current_pass_size, 'out': pass_size})
+
+		snapshot = self._engine.snapshot()
+
+		if snapshot is not None:
+			size = sys.getsizeof(snapshot) + sys.getsizeof(tally) + sys.getsizeof(key)
+			cache.put(key, (snapshot, tally, pass_size, last_word), size)
+
+		return tally, pass_size, last_word
+
+
+	@staticmethod
+	def prepare_engine(settings, context):
+		"""
+		Build the shared data of the selected pass engine for every word length
+		up front, instead of on the first game of each length
+		"""
+
+		engine_class = HangmanLetterStrategy._engines[settings.engine]
+
+		for length in context.word_index.lengths():
+			engine_class.prepare(context, length)
+
+
 	def __check_last_guess(self, game):
 		"""
 		Helper function to check if the last guess was correct or not
@@ -197,22 +309,43 @@ class HangmanLetterStrategy:
 
 		assert(sum(tally.values()) > 0 and pass_size > 1)
 
-		letter, count = self.__letter_most_common_hybrid(tally, pass_size)
+		name = self._selection
+
+		# choices made from the word set partition only depend on the game state,
+		# share them across games
+		key = (name, self._answer_length, self._hangman_pattern, \
+			''.join(sorted(self._guessed_letters)))
+
+		if name in HangmanLetterStrategy._partitioning:
+			cached = self._state_cache.get(key)
+
+			if cached != None: return cached[0]
 
-		msg = "letter is {}, counts is {}, pass_size is {}"
-		self._display.chatty(msg.format(letter, count, pass_size))
+		partitioned = []
+
+		def partition():
+			partitioned.append(name)
+			return self._engine.partition(self._guessed_letters)
+
+		letter, count = HangmanLetterStrategy.select_letter(tally, pass_size, name, partition)
+
+		if len(partitioned) > 0:
+			HangmanLetterStrategy._partitioning.add(name)
+			self._state_cache.put(key, (letter, count), sys.getsizeof(key))
+
+		self._display.chatty("letter is {}, counts is {}, pass_size is {}", letter, count, pass_size)
 
 		return letter
 
 
-	def __letter_most_common(self, tally, pass_size):
+	@staticmethod
+	def __letter_most_common(tally, pass_size):
 		"""
 		Most common letter retrieval strategy.  
 		Get the first letter with the highest frequency in the possible hangman word set.
 		Doesn't handle tie's between letters.
 
 		Args:
-			self
 			tally - a dict of the letter, frequency counts
 			pass_size -  number of words in word set 
 
@@ -229,7 +362,35 @@ class HangmanLetterStrategy:
 	
 		return letter, count
 
-	def __letter_most_common_hybrid(self, tally, pass_size):
+	@staticmethod
+	def select_letter(tally, pass_size, strategy_name = 'hybrid', partition = None):
+		"""
+		The letter selection of a registered strategy, see _strategies.  Used by
+		the games and for replaying the strategy outside of a game
+		(e.g. HangmanDecisionTree)
+
+		Args:
+			tally - a dict of the letter, frequency counts
+			pass_size -  number of words in word set 
+			strategy_name - name of a registered strategy, see strategy_names
+			partition - function returning the word set partition by letter
+				(see HangmanPatternPartition), called by the strategies needing it
+
+		Returns:
+			letter - best letter
+			count - letter frequency count
+		"""
+
+		selection = HangmanLetterStrategy._strategies.get(strategy_name)
+
+		if selection == None:
+			raise Exception("Unknown letter strategy: " + strategy_name)
+
+		return selection(tally, pass_size, partition)
+
+
+	@staticmethod
+	def __letter_most_common_hybrid(tally, pass_size):
 		"""
 		Most common letter retrieval strategy with a twist.  
 		Get the first letter with the highest frequency for when the current possible 
@@ -244,7 +405,6 @@ class HangmanLetterStrategy:
 
 
 		Args:
-			self
 			tally - a dict of the letter, frequency counts
 			pass_size -  number of words in word set 
 
@@ -294,7 +454,62 @@ class HangmanLetterStrategy:
 		return letter, count
 
 
-	def __letter_closest_half(self, tally, pass_size):
+	@staticmethod
+	def __letter_information_gain(tally, pass_size, partitions):
+		"""
+		Information gain letter retrieval strategy.
+		Get the letter whose guess splits the possible hangman word set into
+		the most even blocks of reveal patterns, i.e. whose outcome carries the
+		highest expected information (entropy).  The engine partitions the word
+		set for all letters at once.
+
+		Ties go to the more common letter.  Falls back to the hybrid strategy
+		when no letter splits the word set.
+
+		Args:
+			tally - a dict of the letter, frequency counts
+			pass_size -  number of words in word set 
+			partitions - the word set partition by letter, see HangmanPatternPartition
+
+		Returns:
+			letter - best letter
+			count - letter frequency count
+		"""
+
+		letter, count, best_gain = None, None, 0.0
+
+		for candidate, candidate_count in tally.most_common():
+			sizes = partitions.get(candidate)
+
+			if sizes == None: continue
+
+			gain = HangmanLetterStrategy.__information_gain(sizes, pass_size)
+
+			if gain > best_gain:
+				letter, count, best_gain = candidate, candidate_count, gain
+
+		if letter == None:
+			letter, count = HangmanLetterStrategy.__letter_most_common_hybrid(tally, pass_size)
+
+		return letter, count
+
+
+	@staticmethod
+	def __information_gain(sizes, pass_size):
+		"""
+		Returns: The entropy in bits of the word set partition with the given block sizes
+		"""
+
+		total = 0.0
+
+		for size in sizes:
+			total += size * math.log(size, 2)
+
+		return math.log(pass_size, 2) - total / pass_size
+
+
+	@staticmethod
+	def __letter_closest_half(tally, pass_size):
 		"""
 		Choose the letter based on letter frequency count that is closest to half the 
 		current possible hangman word set size 
@@ -302,7 +517,6 @@ class HangmanLetterStrategy:
 		Doesn't handle tie's between letters.
 
 		Args:
-			self
 			tally - a dict of the letter, frequency counts
 			pass_size -  number of words in word set 
 
@@ -326,3 +540,39 @@ class HangmanLetterStrategy:
 		self._current_pass_size = pass_size
 		self._letter_counts.clear()
 		self._letter_counts += letter_counts
+
+
+	@staticmethod
+	def register_strategy(name, selection):
+		"""
+		Register a letter selection strategy under name, selection is a function
+		(tally, pass_size, partition) returning the (letter, count) to guess,
+		see select_letter
+		"""
+		HangmanLetterStrategy._strategies[name] = selection
+		HangmanLetterStrategy._partitioning.discard(name)
+
+
+	@staticmethod
+	def strategy_names():
+		"""
+		Returns: The sorted names of the registered letter selection strategies
+		"""
+		return sorted(HangmanLetterStrategy._strategies.keys())
+
+
+	#Letter selection strategies selectable through the settings, name to
+	#function (tally, pass_size, partition) returning the (letter, count) to guess
+	_strategies = {
+		'hybrid': lambda tally, pass_size, partition: \
+			HangmanLetterStrategy.__letter_most_common_hybrid(tally, pass_size),
+		'most_common': lambda tally, pass_size, partition: \
+			HangmanLetterStrategy.__letter_most_common(tally, pass_size),
+		'closest_half': lambda tally, pass_size, partition: \
+			HangmanLetterStrategy.__letter_closest_half(tally, pass_size),
+		'information': lambda tally, pass_size, partition: \
+			HangmanLetterStrategy.__letter_information_gain(tally, pass_size, partition())}
+
+	#Names of the strategies seen calling for the word set partition, their
+	#choices are shared across games through the game state cache
+	_partitioning = set()
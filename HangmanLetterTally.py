@@ -0,0 +1,164 @@
+from collections import Counter
+
+from HangmanWordIndex import HangmanWordIndex
+
+
+class HangmanLetterTally:
+	"""
+	Unique letter tallies of a word set, recounted or updated incrementally.
+
+	A reduce splits the previous word set into the kept and the removed words.
+	When fewer words are removed than kept, the new tally is the previous one
+	minus the removed words' letters, otherwise the kept words are recounted.
+
+	Either way the tally Counter lists its letters in the order they are first
+	seen walking the kept words, as a full recount would, so tie breaks between
+	equally common letters stay the same on both paths.
+
+	Partial tallies of consecutive slices of a word set (see HangmanShardPool)
+	carry their letters in first seen order, merging them in slice order gives
+	the recount of the whole word set, letter ordering included.
+
+	Used by HangmanWordPassEngine and HangmanMemoryPassEngine.
+	"""
+
+	DELTA = 'delta'
+	RECOUNT = 'recount'
+
+
+	@staticmethod
+	def count(letters, ids, exclusion):
+		"""
+		Tally the unique word letters of the word set in word id order,
+		ignoring the letters found in the exclusion set
+		"""
+
+		tally = Counter()
+		excluded = ''.join(exclusion)
+
+		for word_id in ids:
+			for letter in letters[word_id].translate(None, excluded):
+				tally[letter] += 1
+
+		return tally
+
+
+	@staticmethod
+	def update(previous, letters, presence, kept, removed, exclusion, kept_size = None):
+		"""
+		Tally the kept word set from the smaller side of the split
+
+		Args:
+			previous - tally of the word set before the split, None if unknown
+			letters - unique letters of the length bucket words, see HangmanWordIndex.letters
+			presence - letter presence masks of the bucket words
+			kept - ids of the kept words in word set order, walked once
+			removed - ids of the removed words, None when not kept for being
+				the larger side
+			exclusion - letters to ignore, a superset of the previous tally's
+			kept_size - number of kept words, len(kept) by default
+
+		Returns:
+			(tally, path) tuple, path is DELTA or RECOUNT
+		"""
+
+		if kept_size == None: kept_size = len(kept)
+
+		if previous == None or removed == None or len(removed) >= kept_size:
+			return (HangmanLetterTally.count(letters, kept, exclusion), HangmanLetterTally.RECOUNT)
+
+		counts = dict(previous)
+
+		for letter, count in HangmanLetterTally.count(letters, removed, exclusion).iteritems():
+			counts[letter] -= count
+
+		for letter in exclusion: counts.pop(letter, None)
+
+		return (HangmanLetterTally.__ordered(counts, letters, presence, kept), HangmanLetterTally.DELTA)
+
+
+	@staticmethod
+	def count_partial(letters, presence, ids, exclusion):
+		"""
+		Tally a slice of a word set for merge
+
+		Returns:
+			(counts, order) tuple, the letter counts dict and the counted
+			letters in first seen order
+		"""
+
+		counts = dict(HangmanLetterTally.count(letters, ids, exclusion))
+
+		return (counts, HangmanLetterTally.__first_seen(counts, letters, presence, ids))
+
+
+	@staticmethod
+	def merge(partials):
+		"""
+		Merge the partial tallies of consecutive word set slices, in word set
+		order, see count_partial
+
+		Returns: The tally Counter of the whole word set
+		"""
+
+		totals = {}
+		order = []
+
+		for counts, letters in partials:
+			for letter in letters:
+				if letter not in totals:
+					totals[letter] = 0
+					order.append(letter)
+
+				totals[letter] += counts[letter]
+
+		tally = Counter()
+
+		for letter in order: tally[letter] = totals[letter]
+
+		return tally
+
+
+	@staticmethod
+	def __ordered(counts, letters, presence, kept):
+		"""
+		Build the tally Counter of the letter counts in first seen order
+		"""
+
+		tally = Counter()
+
+		for letter in HangmanLetterTally.__first_seen(counts, letters, presence, kept):
+			tally[letter] = counts[letter]
+
+		return tally
+
+
+	@staticmethod
+	def __first_seen(counts, letters, presence, kept):
+		"""
+		Returns: The counted letters in the order they are first seen, walking
+		the kept words only until every counted letter has been seen
+		"""
+
+		base = HangmanWordIndex.LETTER_BASE
+
+		unseen = 0
+
+		for letter, count in counts.iteritems():
+			if count > 0: unseen |= 1 << (ord(letter) - base)
+
+		order = []
+
+		for word_id in kept:
+			if unseen == 0: break
+
+			if presence[word_id] & unseen == 0: continue
+
+			for letter in letters[word_id]:
+				bit = 1 << (ord(letter) - base)
+
+				if unseen & bit:
+					order.append(letter)
+					unseen &= ~bit
+
+		return order
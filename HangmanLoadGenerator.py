@@ -0,0 +1,140 @@
+import json
+import socket
+import threading
+import timeit
+
+from HangmanGame import HangmanGame
+from HangmanPhaseTimings import HangmanPhaseTimings
+
+
+class HangmanLoadGenerator:
+	"""
+	Load generator of a HangmanGuessServer.
+
+	Each client thread holds one connection and plays its share of the
+	secrets through the service: it keeps the secret in a local HangmanGame,
+	makes the suggested guesses there and reveals the resulting patterns to
+	the service.  Every request round trip is timed, the report gives the
+	requests per second, latency percentiles and the average score, which
+	matches the PlayHangman score of the same secrets.
+	"""
+
+	_PERCENTILES = [50, 90, 99]
+
+
+	def __init__(self, host, port, clients, max_incorrect, dictionary = None):
+
+		self._address = (host, port)
+		self._clients = clients
+		self._max_incorrect = max_incorrect
+		self._dictionary = dictionary
+
+
+	def run(self, secrets):
+		"""
+		Play the secrets across the client threads
+
+		Returns: The results dict, see report
+		"""
+
+		shares = [secrets[i::self._clients] for i in xrange(self._clients)]
+		outcomes = [None] * self._clients
+
+		def client(index):
+			outcomes[index] = self.__play(shares[index])
+
+		threads = [threading.Thread(target=client, args=(i,)) for i in xrange(self._clients)]
+
+		start = timeit.default_timer()
+
+		for thread in threads: thread.start()
+		for thread in threads: thread.join()
+
+		elapsed = timeit.default_timer() - start
+
+		latencies = sorted(seconds for _, _, client_latencies in outcomes \
+			for seconds in client_latencies)
+
+		games = sum(client_games for client_games, _, _ in outcomes)
+		total = sum(client_total for _, client_total, _ in outcomes)
+
+		results = {'clients': self._clients, 'games': games, 'requests': len(latencies), \
+			'seconds': elapsed, 'requests_per_sec': len(latencies) / elapsed, \
+			'average_score': float(total) / max(games, 1)}
+
+		for percentile in HangmanLoadGenerator._PERCENTILES:
+			results['p{}_ms'.format(percentile)] = \
+				1000 * HangmanPhaseTimings.percentile(latencies, percentile)
+
+		return results
+
+
+	def __play(self, secrets):
+		"""
+		Play the secrets over one connection
+
+		Returns: (games, total score, request latencies in seconds) tuple
+		"""
+
+		sock = socket.create_connection(self._address)
+		sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+		responses = sock.makefile('r')
+		latencies = []
+		total = 0
+
+		def request(message):
+			start = timeit.default_timer()
+
+			sock.sendall(json.dumps(message) + '\n')
+			response = json.loads(responses.readline())
+
+			latencies.append(timeit.default_timer() - start)
+
+			return response
+
+		try:
+			for secret in secrets:
+				game = HangmanGame(secret, self._max_incorrect)
+
+				start = {'op': 'start', 'length': len(secret)}
+
+				if self._dictionary != None: start['dictionary'] = self._dictionary
+
+				response = request(start)
+
+				while 'guess' in response:
+					if response['kind'] == 'letter':
+						pattern = game.guess_letter(response['guess'])
+					else:
+						pattern = game.guess_word(response['guess'])
+
+					response = request({'op': 'reveal', 'session': response['session'], \
+						'pattern': pattern})
+
+				if 'error' in response and 'session' not in response:
+					raise Exception("Service error: {}".format(response['error']))
+
+				total += game.current_score()
+
+		finally:
+			sock.close()
+
+		return (len(secrets), total, latencies)
+
+
+	@staticmethod
+	def report(results, display):
+		"""
+		Display the load results
+		"""
+
+		display.bare("{} clients, {} games, {} requests in {:.2f}s: {:.1f} requests/sec", \
+			results['clients'], results['games'], results['requests'], \
+			results['seconds'], results['requests_per_sec'])
+
+		display.bare("Latency p50 {:.3f}ms, p90 {:.3f}ms, p99 {:.3f}ms", \
+			results['p50_ms'], results['p90_ms'], results['p99_ms'])
+
+		display.bare("Given {} words, average word score is {}", \
+			results['games'], results['average_score'])
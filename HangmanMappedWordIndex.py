@@ -0,0 +1,281 @@
+import ctypes
+import mmap
+import operator
+import struct
+import sys
+
+from HangmanWordIndex import HangmanWordIndex
+
+
+class HangmanMappedWordIndex(HangmanWordIndex):
+	"""
+	HangmanWordIndex backed by a compiled binary dictionary file mapped into memory.
+
+	The compiled file holds the words already normalized and grouped by length,
+	along with their precomputed letter bitmask encodings, so loading it does no
+	parsing, sorting or encoding.  Length buckets and masks are served straight
+	from the mapping, without copies: a bucket slices its words out of the fixed
+	stride records on access and the masks are ctypes arrays over the mask
+	sections.  Processes mapping the same file share its pages through the page
+	cache.  The mapping is copy on write (ctypes only wraps writable buffers),
+	nothing ever writes to it so its pages stay shared.  Buckets and masks are
+	invalid once the index is closed.
+
+	Masks are signed 32-bit integers, 26 letter bits for presence and one bit
+	per position for positions, for words up to 31 letters; sections of longer
+	words store 64-bit position masks.  That is 108 bytes of masks per word
+	against a few bytes of its text, the compiled words.txt is about 20MB for a
+	1.7MB source: the file trades disk and page cache for a startup without
+	encoding, and a shared rather than per process copy of the masks.
+
+	Layout (header fields little endian, arrays in native byte order):
+		header - magic, format version, byte order, source dictionary content
+			hash, number of word lengths
+		table - per word length: length, word count, section offset
+		sections - per word length, at the table offset, each part 8-byte aligned:
+			words - fixed stride records, count * length bytes
+			presence - count 32-bit masks
+			positions - 26 * count position masks, letter code major
+	"""
+
+	_MAGIC = 'HMWI'
+	_FORMAT_VERSION = 2
+	_HEADER = struct.Struct('<4sIc32sI')
+	_TABLE_ENTRY = struct.Struct('<IIQ')
+
+	_ALIGNMENT = 8
+
+	#longest words whose position masks fit the 32-bit masks
+	_NARROW_LENGTH = 31
+
+
+	def __init__(self, name):
+
+		self._fd = open(name, 'rb')
+		self._mapping = mmap.mmap(self._fd.fileno(), 0, access=mmap.ACCESS_COPY)
+
+		header = HangmanMappedWordIndex._HEADER
+		magic, version, byteorder, content_hash, num_lengths = \
+			header.unpack_from(self._mapping, 0)
+
+		if magic != HangmanMappedWordIndex._MAGIC:
+			raise Exception("Not a compiled dictionary file: " + name)
+
+		if version != HangmanMappedWordIndex._FORMAT_VERSION:
+			raise Exception("Unsupported compiled dictionary format version {}, recompile {}".format( \
+				version, name))
+
+		if byteorder != sys.byteorder[0]:
+			raise Exception("Compiled dictionary was built on an incompatible platform: " + name)
+
+		HangmanWordIndex.__init__(self, [], content_hash)
+
+		entry = HangmanMappedWordIndex._TABLE_ENTRY
+		self._sections = {}
+
+		for i in xrange(num_lengths):
+			length, count, offset = entry.unpack_from(self._mapping, header.size + i * entry.size)
+			self._sections[length] = (count, offset)
+			self._size += count
+
+
+	def close(self):
+
+		# the views point into the mapping
+		self._buckets.clear()
+		self._masks.clear()
+
+		self._mapping.close()
+		self._fd.close()
+
+
+	@staticmethod
+	def is_compiled(name):
+		"""
+		Returns: True if the file is a compiled dictionary file
+		"""
+
+		with open(name, 'rb') as fd:
+			return fd.read(len(HangmanMappedWordIndex._MAGIC)) == HangmanMappedWordIndex._MAGIC
+
+
+	@staticmethod
+	def compile(dictfile_name, name):
+		"""
+		Compile the dictionary text file into the binary dictionary file name
+		"""
+
+		word_index = HangmanWordIndex.from_dictfile(dictfile_name)
+		lengths = word_index.lengths()
+
+		header = HangmanMappedWordIndex._HEADER
+		entry = HangmanMappedWordIndex._TABLE_ENTRY
+
+		with open(name, 'wb') as fd:
+			fd.write(header.pack(HangmanMappedWordIndex._MAGIC, HangmanMappedWordIndex._FORMAT_VERSION, \
+				sys.byteorder[0], word_index.content_hash, len(lengths)))
+
+			offset = header.size + len(lengths) * entry.size
+			table = []
+
+			for length in lengths:
+				offset = HangmanMappedWordIndex.__align(offset)
+				count = len(word_index.bucket(length))
+
+				table.append((length, count, offset))
+				offset = HangmanMappedWordIndex.__mask_offsets(length, count, offset)[2]
+
+			for row in table:
+				fd.write(entry.pack(*row))
+
+			for length, count, offset in table:
+				presence_offset, positions_offset, _ = \
+					HangmanMappedWordIndex.__mask_offsets(length, count, offset)
+
+				presence, positions = word_index.masks(length)
+				position_type = HangmanMappedWordIndex.__position_type(length)
+
+				fd.write('\0' * (offset - fd.tell()))
+				fd.write(''.join(word_index.bucket(length)))
+
+				fd.write('\0' * (presence_offset - fd.tell()))
+				fd.write(buffer((ctypes.c_int32 * count)(*presence)))
+
+				fd.write('\0' * (positions_offset - fd.tell()))
+
+				for letter_positions in positions:
+					fd.write(buffer((position_type * count)(*letter_positions)))
+
+
+	@staticmethod
+	def __align(offset):
+		return offset + -offset % HangmanMappedWordIndex._ALIGNMENT
+
+
+	@staticmethod
+	def __position_type(length):
+		return ctypes.c_int32 if length <= HangmanMappedWordIndex._NARROW_LENGTH else ctypes.c_int64
+
+
+	@staticmethod
+	def __mask_offsets(length, count, offset):
+		"""
+		Returns: (presence, positions, end) offsets of the section of the
+		length's words at offset
+		"""
+
+		align = HangmanMappedWordIndex.__align
+
+		presence = align(offset + count * length)
+		positions = align(presence + count * ctypes.sizeof(ctypes.c_int32))
+		end = positions + 26 * count * ctypes.sizeof(HangmanMappedWordIndex.__position_type(length))
+
+		return (presence, positions, end)
+
+
+	def bucket(self, length):
+
+		bucket = self._buckets.get(length)
+
+		if bucket != None: return bucket
+
+		section = self._sections.get(length)
+
+		if section == None: return []
+
+		with self._lock:
+			bucket = self._buckets.get(length)
+
+			if bucket == None:
+				count, offset = section
+				bucket = self._buckets[length] = _HangmanMappedBucket(self._mapping, offset, count, length)
+
+		return bucket
+
+
+	def masks(self, length):
+
+		encoding = self._masks.get(length)
+
+		if encoding != None: return encoding
+
+		section = self._sections.get(length)
+
+		if section == None: return ((ctypes.c_int32 * 0)(), [(ctypes.c_int32 * 0)() for _ in xrange(26)])
+
+		with self._lock:
+			encoding = self._masks.get(length)
+
+			if encoding == None:
+				encoding = self._masks[length] = self.__map_masks(length, section)
+
+		return encoding
+
+
+	def __map_masks(self, length, section):
+		"""
+		Returns: The (presence, positions) masks, ctypes arrays over the mapping
+		"""
+
+		count, offset = section
+
+		presence_offset, positions_offset, _ = \
+			HangmanMappedWordIndex.__mask_offsets(length, count, offset)
+
+		position_type = HangmanMappedWordIndex.__position_type(length)
+		stride = count * ctypes.sizeof(position_type)
+
+		presence = (ctypes.c_int32 * count).from_buffer(self._mapping, presence_offset)
+
+		positions = [(position_type * count).from_buffer(self._mapping, positions_offset + code * stride) \
+			for code in xrange(26)]
+
+		return (presence, positions)
+
+
+	def lengths(self):
+		return sorted(self._sections.keys())
+
+
+class _HangmanMappedBucket:
+	"""
+	Read only sequence of the words of a compiled dictionary length section,
+	each word sliced from its fixed stride record of the mapping on access
+	"""
+
+	def __init__(self, mapping, offset, count, length):
+
+		self._mapping = mapping
+		self._offset = offset
+		self._count = count
+		self._length = length
+
+
+	def __len__(self):
+		return self._count
+
+
+	def __getitem__(self, word_id):
+
+		if isinstance(word_id, slice):
+			return [self[i] for i in xrange(*word_id.indices(self._count))]
+
+		# word ids may come as numpy integers
+		word_id = operator.index(word_id)
+
+		if word_id < 0: word_id += self._count
+
+		if word_id < 0 or word_id >= self._count:
+			raise IndexError("word id out of range")
+
+		start = self._offset + word_id * self._length
+
+		return self._mapping[start:start + self._length]
+
+
+	def __iter__(self):
+
+		mapping, length = self._mapping, self._length
+
+		for start in xrange(self._offset, self._offset + self._count * length, length):
+			yield mapping[start:start + length]
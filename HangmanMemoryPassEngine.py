@@ -0,0 +1,253 @@
+from array import array
+
+from HangmanLetterTally import HangmanLetterTally
+from HangmanPatternPartition import HangmanPatternPartition
+
+
+class HangmanMemoryPassEngine:
+	"""
+	In-memory variant of HangmanWordPassEngine.
+
+	Instead of streaming each pass through the A/B pass files, the current
+	possible hangman word set is kept as a compact array of word ids into the
+	resident length bucket.  Each reduce compacts the array in place.
+
+	Exposes the same setup/set_pass_params/reduce contract as HangmanWordPassEngine
+	and is used exclusively by HangmanLetterStrategy.
+	"""
+
+	def __init__(self, answer_length, settings, mystery_letter, context):
+
+		self._settings = settings
+		self._display = settings.display
+		self._answer_length = answer_length
+		self._mystery_letter = mystery_letter
+		self._current_pass_params = None
+		self._context = context
+
+		# words of the secret length, candidate ids index into this list
+		self._bucket = context.bucket(answer_length)
+		self._presence, self._positions = context.masks(answer_length)
+		self._letters = context.letters(answer_length)
+		self._candidate_ids = None
+
+		#Tally of the current word set, None when unknown (after a restore)
+		self._tally = None
+		self._tally_path = None
+
+
+	def __del__(self):
+
+		self._display = None
+		self._settings = None
+		self._context = None
+		self._bucket = None
+		self._presence = None
+		self._letters = None
+		self._positions = None
+		self._candidate_ids = None
+		self._tally = None
+
+
+	@property
+	def tally_path(self):
+		"""
+		Returns: How the last reduce tallied its word set,
+		HangmanLetterTally.DELTA or HangmanLetterTally.RECOUNT
+		"""
+		return self._tally_path
+
+
+	@staticmethod
+	def prepare(context, length):
+		"""
+		Build the shared per-length data used by the engine ahead of the games
+		"""
+		context.masks(length)
+		context.letters(length)
+
+
+	def setup(self, letter_strategy):
+		"""
+		Setup the engine. Initialize word set and counter structures to accurately
+			reflect current word set and tally data
+		Args: self, strategy
+		Returns: Nothing
+		"""
+
+		self._display.chatty("Entering setup")
+
+		# first pass is every word in the length bucket
+		self._candidate_ids = array('I', xrange(len(self._bucket)))
+
+		counter_tuple = self._context.letter_counts(self._answer_length)
+
+		if counter_tuple != None:
+			pass_size, counter = counter_tuple
+			letter_strategy.set_letter_counts(pass_size, counter)
+
+			self._tally = counter
+
+		else:
+			tally, pass_size, _ = self.__compact_and_tally(set(), None)
+
+			letter_strategy.set_letter_counts(pass_size, tally)
+
+			self._context.cache_letter_counts(self._answer_length, pass_size, tally)
+
+		self._display.chatty("Finished setup")
+
+
+	def close(self):
+		"""
+		Nothing to release, the word set is dropped along with the engine
+		"""
+		pass
+
+
+	def set_pass_params(self, pass_params_tuple_vector):
+		"""
+		Same input tuple vector format as HangmanWordPassEngine.set_pass_params
+		(last_guess_correct, letter, hangman_pattern, predicate, revealed, exclusion)
+		"""
+
+		self._current_pass_params = pass_params_tuple_vector
+
+
+	def reduce(self):
+		"""
+		Reduce the word set space,	update the unique map of letter/counts
+		given the new word set universe
+
+		Returns tuple w/ updated state
+		"""
+
+		last_guess_correct, guess, hangman_pattern, predicate, revealed, exclusion \
+			 = self._current_pass_params
+
+		assert(last_guess_correct != None and guess != None and exclusion != None \
+			and hangman_pattern != None and predicate != None and revealed != None)
+
+		shard_pool = self._context.shard_pool
+
+		if shard_pool != None and len(self._candidate_ids) >= shard_pool.threshold:
+			return self.__sharded_reduce(shard_pool, predicate, exclusion)
+
+		#keep the words whose guessed letter positions are exactly the revealed ones,
+		#or that don't have the letter after a wrong guess
+		keep = predicate.keep(self._presence, self._positions)
+
+		return self.__compact_and_tally(exclusion, keep)
+
+
+	def partition(self, exclusion):
+		"""
+		Returns: The block sizes each letter not in the exclusion set would
+		split the current word set into, see HangmanPatternPartition
+		"""
+
+		ids = self._candidate_ids
+
+		return HangmanPatternPartition.partition(self._letters, self._positions, \
+			ids, len(ids), exclusion)
+
+
+	def snapshot(self):
+		"""
+		Returns: A copy of the current word set (candidate ids) that can be
+		handed back to restore, possibly on another engine of the same word length
+		"""
+		return array('I', self._candidate_ids)
+
+
+	def restore(self, snapshot):
+		"""
+		Reset the current word set to a snapshot taken after a reduce.
+		Its tally is not part of the snapshot, the next reduce recounts
+		"""
+		self._candidate_ids = array('I', snapshot)
+		self._tally = None
+
+
+	def __sharded_reduce(self, shard_pool, predicate, exclusion):
+		"""
+		Filter and recount the word set across the shard pool workers, same
+		word set and tally as __compact_and_tally
+		"""
+
+		tracer = self._display.tracer
+
+		if tracer != None: start = tracer.now()
+
+		size = len(self._candidate_ids)
+
+		ids, tally = shard_pool.reduce(self._answer_length, self._candidate_ids, predicate, exclusion)
+
+		if tracer != None:
+			tracer.complete('filter', start, {'in': size, 'out': len(ids), \
+				'shards': shard_pool.workers})
+
+		self._candidate_ids = ids
+		self._tally = tally
+		self._tally_path = HangmanLetterTally.RECOUNT
+
+		self._display.chatty("Tallied {} kept words across {} shards", len(ids), shard_pool.workers)
+
+		last_word = None
+
+		if len(ids) == 1: last_word = self._bucket[ids[0]]
+
+		return (tally, len(ids), last_word)
+
+
+	def __compact_and_tally(self, exclusion, keep):
+		"""
+		Walk the candidate ids once, moving the ids of the words that are kept
+		to the front of the array and truncating the rest.
+		Tallies the unique word letters of the kept words, ignoring the letters
+		found in the exclusion set (same tally as HangmanWordPassEngine), from
+		the removed words when fewer were removed than kept, see HangmanLetterTally
+		"""
+
+		assert(exclusion != None)
+
+		bucket = self._bucket
+		ids = self._candidate_ids
+		removed = []
+		kept = 0
+
+		tracer = self._display.tracer
+
+		if tracer != None: start = tracer.now()
+
+		for word_id in ids:
+			if keep != None and keep(word_id) == False:
+				removed.append(word_id)
+				continue
+
+			ids[kept] = word_id
+			kept += 1
+
+		del ids[kept:]
+
+		if tracer != None:
+			tracer.complete('filter', start, {'in': kept + len(removed), 'out': kept})
+			start = tracer.now()
+
+		tally, self._tally_path = HangmanLetterTally.update(self._tally, \
+			self._letters, self._presence, ids, removed, exclusion)
+
+		if tracer != None:
+			tracer.complete('tally', start, {'path': self._tally_path, \
+				'words': len(ids), 'removed': len(removed)})
+
+		self._tally = tally
+
+		self._display.chatty("Tallied {} kept words by {}, {} removed", \
+			kept, self._tally_path, len(removed))
+
+		last_word = None
+
+		if kept == 1: last_word = bucket[ids[0]]
+
+		return (tally, kept, last_word)
@@ -0,0 +1,318 @@
+from collections import Counter
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+
+class HangmanNumpyPassEngine:
+	"""
+	Vectorized variant of HangmanWordPassEngine backed by NumPy.
+
+	Each length bucket is encoded once as an (N, L) uint8 matrix of letter codes
+	plus a per-word 26-bit letter presence mask.  The current possible hangman
+	word set is an array of row indices into the bucket matrix.
+
+	A wrong guess is a mask test, a correct guess is a broadcast compare against
+	the revealed positions of the hangman pattern and the unique letter tally
+	is a single column sum.
+
+	Exposes the same setup/set_pass_params/reduce contract as HangmanWordPassEngine
+	and is used exclusively by HangmanLetterStrategy.
+	"""
+
+	_letter_base = ord('a')
+
+
+	def __init__(self, answer_length, settings, mystery_letter, context):
+
+		if np == None:
+			raise Exception("numpy engine requires the numpy package")
+
+		self._settings = settings
+		self._display = settings.display
+		self._answer_length = answer_length
+		self._mystery_letter = mystery_letter
+		self._current_pass_params = None
+		self._context = context
+
+		self._bucket = context.bucket(answer_length)
+		self._letters, self._presence, self._has_letter = \
+			HangmanNumpyPassEngine.__get_encoding(context, answer_length)
+
+		self._candidate_rows = None
+
+
+	def __del__(self):
+
+		self._display = None
+		self._settings = None
+		self._context = None
+		self._bucket = None
+		self._candidate_rows = None
+
+
+	@staticmethod
+	def __get_encoding(context, length):
+		"""
+		Returns: The length bucket encoding, shared through the dictionary context
+		"""
+
+		return context.shared(('numpy', length), \
+			lambda: HangmanNumpyPassEngine.__encode(context.bucket(length), length))
+
+
+	@staticmethod
+	def __encode(bucket, length):
+		"""
+		Encode the length bucket as matrices:
+			letters - (N, L) uint8 matrix of letter codes 0-25
+			presence - (N,) uint32 26-bit letter presence masks
+			has_letter - (N, 26) uint8 matrix, 1 if the word contains the letter
+		"""
+
+		letters = np.frombuffer(''.join(bucket), dtype=np.uint8).reshape(len(bucket), length) \
+			- HangmanNumpyPassEngine._letter_base
+
+		presence = np.bitwise_or.reduce(np.left_shift(np.uint32(1), letters.astype(np.uint32)), axis=1) \
+			if len(bucket) > 0 else np.zeros(0, dtype=np.uint32)
+
+		has_letter = ((presence[:, np.newaxis] >> np.arange(26, dtype=np.uint32)) & 1).astype(np.uint8)
+
+		return (letters, presence, has_letter)
+
+
+	@staticmethod
+	def prepare(context, length):
+		"""
+		Build the shared per-length data used by the engine ahead of the games
+		"""
+		if np != None:
+			HangmanNumpyPassEngine.__get_encoding(context, length)
+
+
+	def setup(self, letter_strategy):
+		"""
+		Setup the engine. Initialize word set and counter structures to accurately
+			reflect current word set and tally data
+		Args: self, strategy
+		Returns: Nothing
+		"""
+
+		self._display.chatty("Entering setup")
+
+		self._candidate_rows = np.arange(len(self._bucket))
+
+		counter_tuple = self._context.letter_counts(self._answer_length)
+
+		if counter_tuple != None:
+			pass_size, counter = counter_tuple
+			letter_strategy.set_letter_counts(pass_size, counter)
+
+		else:
+			tally, pass_size, _ = self.__tally(set())
+
+			letter_strategy.set_letter_counts(pass_size, tally)
+
+			self._context.cache_letter_counts(self._answer_length, pass_size, tally)
+
+		self._display.chatty("Finished setup")
+
+
+	def close(self):
+		"""
+		Nothing to release, the word set is dropped along with the engine
+		"""
+		pass
+
+
+	def set_pass_params(self, pass_params_tuple_vector):
+		"""
+		Same input tuple vector format as HangmanWordPassEngine.set_pass_params
+		(last_guess_correct, letter, hangman_pattern, predicate, revealed, exclusion)
+		"""
+
+		self._current_pass_params = pass_params_tuple_vector
+
+
+	def reduce(self):
+		"""
+		Reduce the word set space,	update the unique map of letter/counts
+		given the new word set universe
+
+		Returns tuple w/ updated state
+		"""
+
+		last_guess_correct, guess, hangman_pattern, predicate, _, exclusion \
+			 = self._current_pass_params
+
+		assert(last_guess_correct != None and guess != None and exclusion != None \
+			and hangman_pattern != None and predicate != None)
+
+		tracer = self._display.tracer
+
+		if tracer != None: start = tracer.now()
+
+		rows = self._candidate_rows
+
+		if last_guess_correct:
+			keep = self.__match_pattern(rows, predicate)
+		else:
+			bit = np.uint32(1 << (ord(guess) - HangmanNumpyPassEngine._letter_base))
+			keep = (self._presence[rows] & bit) == 0
+
+		self._candidate_rows = rows[keep]
+
+		if tracer != None:
+			tracer.complete('filter', start, {'in': len(rows), 'out': len(self._candidate_rows)})
+			start = tracer.now()
+
+		updated_state_tuple = self.__tally(exclusion)
+
+		if tracer != None: tracer.complete('tally', start, {'words': updated_state_tuple[1]})
+
+		return updated_state_tuple
+
+
+	def partition(self, exclusion):
+		"""
+		Returns: The block sizes each letter not in the exclusion set would
+		split the current word set into, the block of words without the letter
+		last.  The (word, letter) position masks of the word set are built with
+		one vector operation per position and counted with a single unique
+		"""
+
+		base = HangmanNumpyPassEngine._letter_base
+		length = self._answer_length
+
+		candidates = self._letters[self._candidate_rows]
+		pass_size = len(candidates)
+
+		# position mask of every letter in every word, 0 if absent
+		masks = np.zeros((pass_size, 26), dtype=np.uint64)
+		words = np.arange(pass_size)
+
+		for position in xrange(length):
+			masks[words, candidates[:, position]] |= np.uint64(1 << position)
+
+		keys = (np.arange(26, dtype=np.uint64) << np.uint64(length)) | masks
+		values, counts = np.unique(keys, return_counts=True)
+
+		codes = (values >> np.uint64(length)).astype(np.int64)
+		present = (values & np.uint64((1 << length) - 1)) != 0
+
+		blocks = {}
+		absent = {}
+
+		for code, is_present, count in zip(codes, present, counts):
+			letter = chr(code + base)
+
+			if letter in exclusion: continue
+
+			if is_present:
+				blocks.setdefault(letter, []).append(int(count))
+			else:
+				absent[letter] = int(count)
+
+		for letter, sizes in blocks.iteritems():
+			if letter in absent: sizes.append(absent[letter])
+
+		return blocks
+
+
+	def snapshot(self):
+		"""
+		Returns: The current word set rows, reduce never modifies them in place
+		so they can be shared with restore
+		"""
+		return self._candidate_rows
+
+
+	def restore(self, snapshot):
+		"""
+		Reset the current word set to a snapshot taken after a reduce
+		"""
+		self._candidate_rows = snapshot
+
+
+	def __match_pattern(self, rows, predicate):
+		"""
+		Boolean mask of the candidate rows whose revealed positions match the
+		hangman pattern and whose unknown positions avoid the exclusion set,
+		as compiled in the predicate
+		"""
+
+		known = list(predicate.known)
+		unknown = list(predicate.unknown)
+
+		candidates = self._letters[rows]
+
+		target = np.array(predicate.known_codes, dtype=np.uint8)
+
+		keep = (candidates[:, known] == target).all(axis=1)
+
+		if len(unknown) > 0 and predicate.forbidden != 0:
+			excluded = np.zeros(26, dtype=np.bool_)
+			excluded[[code for code in xrange(26) if predicate.forbidden >> code & 1]] = True
+
+			keep &= ~excluded[candidates[:, unknown]].any(axis=1)
+
+		return keep
+
+
+	def __tally(self, exclusion):
+		"""
+		Tally the unique word letters of the current word set with a column sum,
+		ignoring the letters found in the exclusion set
+		"""
+
+		rows = self._candidate_rows
+		pass_size = len(rows)
+
+		has_letter = self._has_letter[rows]
+		counts = has_letter.sum(axis=0)
+
+		for letter in exclusion:
+			counts[ord(letter) - HangmanNumpyPassEngine._letter_base] = 0
+
+		tally = self.__ordered_counter(counts, has_letter, rows)
+
+		last_word = None
+
+		if pass_size == 1: last_word = self._bucket[rows[0]]
+
+		return (tally, pass_size, last_word)
+
+
+	def __ordered_counter(self, counts, has_letter, rows):
+		"""
+		Build the tally Counter inserting the letters in the order they are first
+		seen walking the word set, as the streaming tally of HangmanWordPassEngine does.
+		Keeps tie breaks between equally common letters identical across engines
+		"""
+
+		base = HangmanNumpyPassEngine._letter_base
+
+		codes = np.flatnonzero(counts)
+
+		if len(codes) == 0: return Counter()
+
+		# first word (row) in the word set containing each letter
+		first_rows = has_letter[:, codes].argmax(axis=0)
+
+		order = []
+
+		for code, first_row in zip(codes, first_rows):
+			letter = chr(code + base)
+			word = self._bucket[rows[first_row]]
+			order.append((first_row, word.index(letter), letter, int(counts[code])))
+
+		order.sort()
+
+		tally = Counter()
+
+		for _, _, letter, count in order:
+			tally[letter] = count
+
+		return tally
@@ -0,0 +1,121 @@
+import collections
+import itertools
+import multiprocessing
+import multiprocessing.pool
+
+from Hangman import Hangman
+from HangmanLetterStrategy import HangmanLetterStrategy
+
+
+#(settings, tree, context) of the run, set before the pool is forked so
+#the workers inherit them along with the dictionary index
+_worker_state = None
+
+
+def _play_chunk(secrets):
+	"""
+	Worker function, plays a chunk of secrets
+	Returns: list of (secret, score, record) tuples in chunk order, the game
+	records (see Hangman.record) only when the settings write results
+	"""
+
+	settings, tree, context = _worker_state
+
+	records = settings.resultsfile != None
+
+	results = []
+
+	for secret in secrets:
+		hangman = Hangman(settings, tree, context)
+		score = hangman.play(secret, settings.max_incorrect)
+
+		results.append((secret, score, hangman.record() if records else None))
+
+	#a worker process exits without writing out its buffered display
+	settings.display.flush()
+
+	return results
+
+
+class HangmanParallelRunner:
+	"""
+	Plays a stream of hangman secrets across a pool of worker processes,
+	or worker threads of this process.
+
+	The dictionary index (and the selected engine's per-length data) is built
+	in the parent before the pool is forked, so the workers share it copy-on-write
+	instead of each rebuilding it.  Worker threads share the same dictionary
+	context directly.  Secrets are handed out in chunks and the scores come
+	back in input order.  At most _IN_FLIGHT chunks per worker are read ahead
+	of the results, so any number of secrets plays in bounded memory.
+	"""
+
+	_CHUNK_SIZE = 16
+
+	_IN_FLIGHT = 4
+
+	def __init__(self, settings, tree, context, workers, threads = False):
+
+		self._settings = settings
+		self._tree = tree
+		self._context = context
+		self._workers = workers
+		self._threads = threads
+
+
+	def play(self, secrets):
+		"""
+		Generator function that plays the secrets and yields (secret, score, record)
+		tuples in the order of the secrets, see _play_chunk
+		"""
+
+		global _worker_state
+
+		_worker_state = (self._settings, self._tree, self._context)
+
+		if self._tree == None:
+			HangmanLetterStrategy.prepare_engine(self._settings, self._context)
+
+		#the forked workers would write the lines buffered so far again
+		self._settings.display.flush()
+
+		if self._threads:
+			self._settings.display.clock("Starting {} worker threads", self._workers)
+			pool = multiprocessing.pool.ThreadPool(self._workers)
+		else:
+			self._settings.display.clock("Forking {} workers", self._workers)
+			pool = multiprocessing.Pool(self._workers)
+
+		try:
+			pending = collections.deque()
+
+			for chunk in self.__chunks(secrets):
+				pending.append(pool.apply_async(_play_chunk, (chunk,)))
+
+				if len(pending) >= self._workers * HangmanParallelRunner._IN_FLIGHT:
+					for result in pending.popleft().get():
+						yield result
+
+			while len(pending) > 0:
+				for result in pending.popleft().get():
+					yield result
+
+			pool.close()
+
+		finally:
+			pool.terminate()
+			pool.join()
+
+			_worker_state = None
+
+
+	def __chunks(self, secrets):
+
+		secrets = iter(secrets)
+
+		while True:
+			chunk = list(itertools.islice(secrets, HangmanParallelRunner._CHUNK_SIZE))
+
+			if len(chunk) == 0: break
+
+			yield chunk
@@ -0,0 +1,58 @@
+from HangmanWordIndex import HangmanWordIndex
+
+
+class HangmanPatternPartition:
+	"""
+	Partition of a word set by the hangman pattern each letter would reveal.
+
+	Guessing a letter splits the word set into blocks of words showing the
+	letter at the same positions, plus the block of words without the letter.
+	The block sizes of every letter are gathered in a single walk over the
+	word set, visiting each word's unique letters once, rather than one walk
+	per letter.
+
+	Used by HangmanWordPassEngine and HangmanMemoryPassEngine for the
+	information gain letter strategy of HangmanLetterStrategy.
+	"""
+
+	@staticmethod
+	def partition(letters, positions, ids, pass_size, exclusion):
+		"""
+		Args:
+			letters - unique letters of the length bucket words, see HangmanWordIndex.letters
+			positions - letter position masks of the bucket words, see HangmanWordIndex.masks
+			ids - ids of the words in the word set
+			pass_size - number of words in the word set
+			exclusion - letters to leave out e.g. already guessed letters
+
+		Returns:
+			dict of letter to the list of its block sizes, for every letter
+			found in the word set, the block of words without the letter last
+		"""
+
+		base = HangmanWordIndex.LETTER_BASE
+		excluded = ''.join(exclusion)
+
+		histograms = {}
+
+		for word_id in ids:
+			for letter in letters[word_id].translate(None, excluded):
+				histogram = histograms.get(letter)
+
+				if histogram == None:
+					histogram = histograms[letter] = {}
+
+				mask = positions[ord(letter) - base][word_id]
+				histogram[mask] = histogram.get(mask, 0) + 1
+
+		blocks = {}
+
+		for letter, histogram in histograms.iteritems():
+			sizes = histogram.values()
+			absent = pass_size - sum(sizes)
+
+			if absent > 0: sizes.append(absent)
+
+			blocks[letter] = sizes
+
+		return blocks
@@ -0,0 +1,133 @@
+from HangmanStateCache import HangmanStateCache
+from HangmanWordIndex import HangmanWordIndex
+
+
+class HangmanPatternPredicate:
+	"""
+	Game state after a letter guess, compiled once into the word filter the
+	pass engines apply to their word sets.
+
+	Compiled from the hangman pattern, the guessed letter and the exclusion set
+	of guessed letters:
+		known - positions of the revealed letters, with their letter codes
+		unknown - positions still hidden
+		revealed - bitmask of the positions holding the guessed letter, 0 for
+			a wrong guess, with count the number of occurrences it requires
+		forbidden - 26-bit mask of the letters the hidden positions can't hold
+
+	Earlier passes already pinned the positions of every previously guessed
+	letter, so a word id filter only checks the guessed letter: its position
+	mask equals revealed (correct guess), or the letter is absent (wrong guess).
+	The filter is a single integer compare per word, with no per-word allocation.
+
+	Predicates never change once compiled, they are shared across games through
+	a bounded cache keyed by the game state.
+	"""
+
+	#estimated bytes of a cached predicate besides its key
+	_ENTRY_BYTES = 600
+
+	_cache = HangmanStateCache(4 << 20)
+
+
+	def __init__(self, hangman_pattern, letter, exclusion, mystery_letter):
+
+		base = HangmanWordIndex.LETTER_BASE
+
+		self._letter = letter
+		self._code = ord(letter) - base
+
+		self._known = tuple(i for i, c in enumerate(hangman_pattern) if c != mystery_letter)
+		self._known_codes = tuple(ord(hangman_pattern[i]) - base for i in self._known)
+		self._unknown = tuple(i for i, c in enumerate(hangman_pattern) if c == mystery_letter)
+
+		self._revealed = 0
+
+		for i in self._known:
+			if hangman_pattern[i] == letter: self._revealed |= 1 << i
+
+		self._count = bin(self._revealed).count('1')
+
+		self._forbidden = 0
+
+		for excluded in exclusion:
+			self._forbidden |= 1 << (ord(excluded) - base)
+
+
+	@staticmethod
+	def compile(hangman_pattern, letter, exclusion, mystery_letter):
+		"""
+		Returns: The predicate of the game state, compiled by an earlier game
+		when it reached the same state
+		"""
+
+		key = (hangman_pattern, letter, frozenset(exclusion))
+
+		cache = HangmanPatternPredicate._cache
+		predicate = cache.get(key)
+
+		if predicate == None:
+			predicate = HangmanPatternPredicate(hangman_pattern, letter, exclusion, mystery_letter)
+			cache.put(key, predicate, HangmanPatternPredicate._ENTRY_BYTES + 16 * len(hangman_pattern))
+
+		return predicate
+
+
+	@staticmethod
+	def cache():
+		return HangmanPatternPredicate._cache
+
+
+	@property
+	def letter(self):
+		return self._letter
+
+	@property
+	def correct(self):
+		return self._revealed != 0
+
+	@property
+	def revealed(self):
+		return self._revealed
+
+	@property
+	def count(self):
+		return self._count
+
+	@property
+	def known(self):
+		return self._known
+
+	@property
+	def known_codes(self):
+		return self._known_codes
+
+	@property
+	def unknown(self):
+		return self._unknown
+
+	@property
+	def forbidden(self):
+		return self._forbidden
+
+
+	def keep(self, presence, positions):
+		"""
+		Word id filter over the letter masks of a length bucket
+
+		Args:
+			presence, positions - the bucket masks, see HangmanWordIndex.masks
+
+		Returns: Function of a word id, True if the word fits the game state
+		"""
+
+		revealed = self._revealed
+
+		if revealed != 0:
+			#the positions of the guessed letter in the word must be exactly the revealed ones
+			letter_positions = positions[self._code]
+			return lambda word_id: letter_positions[word_id] == revealed
+
+		#the word must not have the letter
+		bit = 1 << self._code
+		return lambda word_id: presence[word_id] & bit == 0
@@ -0,0 +1,85 @@
+from HangmanTracer import HangmanTracer
+
+
+class HangmanPhaseTimings:
+	"""
+	Recorder of the durations of the game play phases, e.g. engine setup,
+	reduce and tally, summarized as percentiles.
+
+	Takes the place of the HangmanTracer on the display (same complete/instant
+	calls), keeping only the span durations by name, so the benchmark suite
+	can time thousands of games without holding every span.
+	"""
+
+	_PERCENTILES = [50, 90, 99]
+
+	now = staticmethod(HangmanTracer.now)
+
+
+	def __init__(self):
+		self._samples = {}
+
+
+	def complete(self, name, start, args = None):
+		"""
+		Record the duration of the span name started at start (see now)
+		"""
+		self.record(name, (HangmanTracer.now() - start) / 1e9)
+
+
+	def instant(self, name, args = None):
+		pass
+
+
+	def record(self, phase, seconds):
+		"""
+		Record one duration of the phase
+		"""
+
+		samples = self._samples.get(phase)
+
+		if samples == None:
+			samples = self._samples[phase] = []
+
+		samples.append(seconds)
+
+
+	def phases(self):
+		return sorted(self._samples.keys())
+
+
+	def summary(self):
+		"""
+		Returns: dict of phase to its count, total, mean, percentiles and max
+		durations, in milliseconds
+		"""
+
+		summary = {}
+
+		for phase, samples in self._samples.iteritems():
+			samples = sorted(samples)
+			count = len(samples)
+
+			stats = {'count': count, 'total_ms': 1000 * sum(samples), \
+				'mean_ms': 1000 * sum(samples) / count, 'max_ms': 1000 * samples[-1]}
+
+			for percentile in HangmanPhaseTimings._PERCENTILES:
+				stats['p{}_ms'.format(percentile)] = \
+					1000 * HangmanPhaseTimings.percentile(samples, percentile)
+
+			summary[phase] = stats
+
+		return summary
+
+
+	@staticmethod
+	def percentile(sorted_samples, percentile):
+		"""
+		Returns: The nearest rank percentile of the sorted samples
+		"""
+
+		if len(sorted_samples) == 0: return 0.0
+
+		rank = int(round(percentile / 100.0 * (len(sorted_samples) - 1)))
+
+		return sorted_samples[rank]
@@ -0,0 +1,140 @@
+from HangmanGame import HangmanGame
+
+
+class HangmanRemoteGame:
+	"""
+	Hangman game whose secret word is held by someone else, e.g. a client of
+	HangmanGuessService.
+
+	Offers the HangmanGame state the strategies read.  A guess made by the
+	strategy is pending until the secret holder reports the hangman pattern
+	it revealed through reveal, which checks the pattern is consistent with
+	the guess and the earlier patterns.
+	"""
+
+	def __init__(self, length, max_wrong_guesses):
+
+		self._length = length
+		self._max_wrong_guesses = max_wrong_guesses
+
+		self._guessed_so_far = HangmanGame._MYSTERY_LETTER * length
+		self._correctly_guessed_letters = set()
+		self._incorrectly_guessed_letters = set()
+		self._incorrectly_guessed_words = set()
+
+		#Guess waiting for its revealed pattern
+		self._pending = None
+
+
+	def guess_letter(self, letter):
+		self.assert_can_keep_guessing()
+		self._pending = letter.upper()
+
+	def guess_word(self, word):
+		self.assert_can_keep_guessing()
+		self._pending = word.upper()
+
+
+	def reveal(self, pattern):
+		"""
+		Update the game state with the hangman pattern revealed by the pending guess
+
+			Args:
+				pattern (str) the secret word with MYSTERY_LETTER in place of
+				the letters not guessed yet, e.g. '--E--E-'
+			Returns:
+				the string representation of the current game state
+			Raises:
+				Exception if no guess is pending or the pattern is inconsistent
+		"""
+
+		guess = self._pending
+
+		if guess == None:
+			raise Exception("No guess is waiting for its revealed pattern")
+
+		pattern = pattern.upper()
+		mystery = HangmanGame._MYSTERY_LETTER
+
+		if len(pattern) != self._length:
+			raise Exception("Pattern {} is not {} letters long".format(pattern, self._length))
+
+		for before, after in zip(self._guessed_so_far, pattern):
+			if before != mystery and before != after:
+				raise Exception("Pattern {} hides or changes revealed letters of {}".format( \
+					pattern, self._guessed_so_far))
+
+			if before == mystery and after != mystery and len(guess) == 1 and after != guess:
+				raise Exception("Pattern {} reveals letters other than {}".format(pattern, guess))
+
+		if len(guess) == 1:
+			if pattern == self._guessed_so_far:
+				self._incorrectly_guessed_letters.add(guess)
+			else:
+				self._correctly_guessed_letters.add(guess)
+
+		elif pattern == guess:
+			pass
+
+		elif pattern == self._guessed_so_far:
+			self._incorrectly_guessed_words.add(guess)
+
+		else:
+			raise Exception("Pattern {} is neither the guessed word {} nor unchanged".format(pattern, guess))
+
+		self._guessed_so_far = pattern
+		self._pending = None
+
+		return self.get_guessed_so_far()
+
+
+	def assert_can_keep_guessing(self):
+		if self._pending != None:
+			raise Exception("IllegalStateException: " \
+				+ "Guess {} is waiting for its revealed pattern".format(self._pending))
+
+		if self.game_status() != HangmanGame._STATUS_KEEPGUESSING:
+			raise Exception("IllegalStateException: " \
+				+ "Cannot keep guessing in current game state " \
+				+ "{}".format(self.game_status()))
+
+	def game_status(self):
+		"""
+		Returns: The current game status, see HangmanGame
+		"""
+		if HangmanGame._MYSTERY_LETTER not in self._guessed_so_far:
+			return HangmanGame._STATUS_GAMEWON
+		elif self.num_wrong_guesses_made() > self._max_wrong_guesses:
+			return HangmanGame._STATUS_GAMELOST
+		else:
+			return HangmanGame._STATUS_KEEPGUESSING
+
+	def current_score(self):
+		if self.game_status() == HangmanGame._STATUS_GAMELOST:
+			return HangmanGame._SCORE_GAMELOST
+		else:
+			return self.num_wrong_guesses_made() + len(self._correctly_guessed_letters)
+
+	def num_wrong_guesses_made(self):
+		return len(self._incorrectly_guessed_letters) + len(self._incorrectly_guessed_words)
+
+	def num_wrong_guesses_remaining(self):
+		return self._max_wrong_guesses - self.num_wrong_guesses_made()
+
+	def get_guessed_so_far(self):
+		return self._guessed_so_far
+
+	def get_secret_word_length(self):
+		return self._length
+
+	def __str__(self):
+		return "{}; score={}; status={}".format(self.get_guessed_so_far(), \
+			self.current_score(), HangmanGame._STATUS[self.game_status()])
+
+	@property
+	def status_keep_guessing(self):
+		return HangmanGame._STATUS_KEEPGUESSING
+
+	@property
+	def mystery_letter(self):
+		return HangmanGame._MYSTERY_LETTER
@@ -1,7 +1,12 @@
+import os
 import re
+import sys
+import hashlib
 import argparse
 
 from HangmanDisplay import HangmanDisplay
+from HangmanTracer import HangmanTracer
+from HangmanLetterStrategy import HangmanLetterStrategy
 
 
 class HangmanSettings:
@@ -23,11 +28,13 @@ class HangmanSettings:
 			'normal':_text_display.NORMAL, \
 			'chatty':_text_display.CHATTY}
 
+	_ENGINES = ['file', 'memory', 'numpy', 'index']
+
 	_BASELINE = ['comaker','cumulate','eruptive', 'factual', 'monadism',
 				'mus', 'nagging', 'oses', 'remembered', 'spodumenes',
 				'stereoisomers','toxics','trichromats','triose', 'uniformed']
 
-	def __argparse(self):
+	def __argparse(self, argv):
 		parser = argparse.ArgumentParser(prog='Hangman', 
 			description= 'Please enter a hangman word or specify a list of hangman words.\n ' \
 			+ 'E.g. python PlayHangman.py -f words.txt -w ASTERISK')
@@ -45,18 +52,77 @@ class HangmanSettings:
 		parser.add_argument('-clk', '--clock', 
 			dest='clockflag', action='store_true', help='enable timing output')
 
+		parser.add_argument('-trace', dest='tracefile', type=str,
+			help='write a Chrome trace event JSON file of the game play spans')
+
 		parser.add_argument('-bl', '--baseline', dest='baseline', action='store_const',
 			const=HangmanSettings._BASELINE, help='run hangman against pre-specified baseline')
 
+		parser.add_argument('-engine', help='pass engine backend for reducing the word set',
+			dest='engine', type=str, default='file', choices=HangmanSettings._ENGINES)
+
+		parser.add_argument('-strategy', help='letter selection strategy',
+			dest='strategy', type=str, default='hybrid', choices=HangmanLetterStrategy.strategy_names())
+
+		parser.add_argument('--benchmark', dest='benchmark', action='store_true',
+			help='play the secrets with every strategy and compare score and speed')
+
+		parser.add_argument('--evaluate', dest='evaluate', action='store_true',
+			help='score every dictionary word with the strategy by partitioning the word sets')
+
+		parser.add_argument('-cache', help='game state cache size in megabytes, 0 to disable',
+			dest='cache_mb', type=int, default=64)
+
+		parser.add_argument('-tree', dest='treefile', type=str,
+			help='play using a compiled decision tree file')
+
+		parser.add_argument('--build-tree', dest='build_treefile', type=str,
+			help='compile the decision tree of the dictionary to file and exit')
+
+		parser.add_argument('--compile-dict', dest='compile_dictfile', type=str,
+			help='compile the dictionary to a binary dictionary file and exit')
+
+		parser.add_argument('--ingest-dict', dest='ingest_dictfile', type=str,
+			help='normalize, validate, dedupe and group by length the dictionary words ' \
+			+ 'into a dictionary file and exit')
+
+		parser.add_argument('--ingest-mb', dest='ingest_mb', type=int, default=64,
+			help='sorted run size in megabytes of the dictionary ingest')
+
+		parser.add_argument('--tally-cache', dest='tally_cachedir', type=str,
+			help='directory of the first pass tallies cache files, defaults to ~/.cache/hangman')
+
+		parser.add_argument('--no-tally-cache', dest='tally_cache', action='store_false',
+			help='do not load or write the first pass tallies cache files')
+
+		parser.add_argument('--workers', dest='workers', type=int, default=1,
+			help='number of worker processes playing the secrets')
+
+		parser.add_argument('--threads', dest='threads', action='store_true',
+			help='run the workers as threads of one process sharing the dictionary')
+
+		parser.add_argument('--shards', dest='shards', type=int, default=0,
+			help='number of worker processes sharing each large reduce of the memory engine, ' \
+			+ '0 to reduce in process')
+
+		parser.add_argument('--shard-threshold', dest='shard_threshold', type=int, default=20000,
+			help='smallest word set reduced across the shard workers')
+
 		parser.add_argument('--batch', dest='batchfile',
 			nargs='?', type=argparse.FileType('r'), 
-			help='batch hangmans file name')
+			help='batch hangmans file name, - for stdin')
 
-		return parser.parse_args()
+		parser.add_argument('--results', dest='resultsfile', type=argparse.FileType('w'),
+			help='stream one JSON record per game to the file, - for stdout')
 
+		return parser.parse_args(argv)
 
-	def __init__(self):
-		args = self.__argparse()
+
+	def __init__(self, argv = None):
+		"""
+		Parse the given argument list, the command line arguments by default
+		"""
+		args = self.__argparse(argv)
 
 		self._regex_non_characters = re.compile('[^a-zA-Z]')
 
@@ -68,7 +134,8 @@ class HangmanSettings:
 			self._secrets = args.secrets
 		
 		if(HangmanSettings._DISPLAYLEVELS.get(args.display_type) == \
-			HangmanSettings._DISPLAYLEVELS['none'] and args.baseline == None):
+			HangmanSettings._DISPLAYLEVELS['none'] and args.baseline == None \
+			and args.benchmark == False):
 			self._verboselevel = HangmanSettings._DISPLAYLEVELS['simple']
 		else:
 			self._verboselevel = \
@@ -87,7 +154,41 @@ class HangmanSettings:
 		if args.baseline:
 			self._secrets = args.baseline
 
-		self._display = HangmanDisplay(self._verboselevel, self._clockflag)
+		self._engine = args.engine
+		self._strategy = args.strategy
+		self._benchmark = args.benchmark
+		self._evaluate = args.evaluate
+		self._cache_mb = args.cache_mb
+		self._treefile = args.treefile
+		self._build_treefile = args.build_treefile
+		self._compile_dictfile = args.compile_dictfile
+		self._ingest_dictfile = args.ingest_dictfile
+		self._ingest_bytes = max(1, args.ingest_mb) << 20
+		self._tally_cachedir = args.tally_cachedir
+		self._tally_cache = args.tally_cache
+		self._workers = max(1, args.workers)
+		self._threads = args.threads
+		self._shards = max(0, args.shards)
+		self._shard_threshold = max(1, args.shard_threshold)
+
+		if self._shards > 0 and self._engine != 'memory':
+			raise Exception("Sharded reduces need the memory engine")
+
+		if self._shards > 0 and self._workers > 1 and self._threads == False:
+			raise Exception("Sharded reduces don't mix with worker processes, use --threads")
+
+		self._tracefile = args.tracefile
+		self._resultsfile = args.resultsfile
+
+		tracer = HangmanTracer() if self._tracefile != None else None
+
+		#batch and baseline runs write their many lines buffered
+		buffered = self._batchfile != None or args.baseline != None
+
+		#the game records stream alone on stdout, the display goes to stderr then
+		out = sys.stderr if self._resultsfile is sys.stdout else sys.stdout
+
+		self._display = HangmanDisplay(self._verboselevel, self._clockflag, tracer, buffered, out)
 
 	#convenience function for engine
 	def get_dictfile_name(self): return self._dictfile.name
@@ -134,7 +235,9 @@ class HangmanSettings:
 			try:
 				with self._batchfile as file:
 					for wordline in file:
-						yield wordline.strip().lower()
+						secret = wordline.strip().lower()
+
+						if len(secret) > 0: yield secret
 
 			except IOError as e:
 				print 'Operation failed: %s' % e
@@ -143,6 +246,99 @@ class HangmanSettings:
 	def display(self):
 		return self._display
 
+	@property
+	def engine(self):
+		return self._engine
+
+	@property
+	def strategy(self):
+		return self._strategy
+
+	@property
+	def benchmark(self):
+		return self._benchmark
+
+	@property
+	def cache_bytes(self):
+		return self._cache_mb * 1024 * 1024
+
+	@property
+	def treefile(self):
+		return self._treefile
+
+	@property
+	def build_treefile(self):
+		return self._build_treefile
+
+	@property
+	def compile_dictfile(self):
+		return self._compile_dictfile
+
+	@property
+	def ingest_dictfile(self):
+		return self._ingest_dictfile
+
+	@property
+	def ingest_bytes(self):
+		return self._ingest_bytes
+
+	@property
+	def tally_cachefile(self):
+		"""
+		Returns: The first pass tallies cache file name of the dictionary,
+		None if disabled
+		"""
+		return self.get_tally_cachefile(self.get_dictfile_name())
+
+	def get_tally_cachefile(self, dictfile_name):
+		"""
+		Returns: The first pass tallies cache file name of a dictionary file,
+		None if disabled.  Cache files are kept in the cache directory (the
+		user cache directory by default, not the dictionary's which may be read
+		only or shared), named after the dictionary file and a hash of its path
+		"""
+
+		if self._tally_cache == False: return None
+
+		cachedir = self._tally_cachedir
+
+		if cachedir == None:
+			cachedir = os.path.join(os.environ.get('XDG_CACHE_HOME', \
+				os.path.join(os.path.expanduser('~'), '.cache')), 'hangman')
+
+		path = os.path.realpath(dictfile_name)
+
+		return os.path.join(cachedir, "{}.{}.tallies".format(os.path.basename(path), \
+			hashlib.md5(path).hexdigest()[:12]))
+
+	@property
+	def workers(self):
+		return self._workers
+
+	@property
+	def threads(self):
+		return self._threads
+
+	@property
+	def shards(self):
+		return self._shards
+
+	@property
+	def shard_threshold(self):
+		return self._shard_threshold
+
+	@property
+	def evaluate(self):
+		return self._evaluate
+
+	@property
+	def tracefile(self):
+		return self._tracefile
+
+	@property
+	def resultsfile(self):
+		return self._resultsfile
+
 	@property
 	def max_incorrect(self):
 		return self.__class__._MAX_WRONGGUESSES
@@ -154,11 +350,11 @@ class HangmanSettings:
 	def inspect(self):
 
 		pstr = "HangmanSettings, dictfile {}, secrets {}," + \
-			" verbosity {}, clock {}, batch {}"
+			" verbosity {}, clock {}, batch {}, engine {}"
 
 		print(pstr.format(self._dictfile, \
 				self._secrets, self._verboselevel, 
-				self._clockflag, self._batchfile))
+				self._clockflag, self._batchfile, self._engine))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+import multiprocessing
+
+from array import array
+
+from HangmanLetterTally import HangmanLetterTally
+from HangmanLetterStrategy import HangmanLetterStrategy
+
+
+#Dictionary context of a worker process, set by _init_shard_worker
+_shard_context = None
+
+
+def _init_shard_worker(context):
+	"""
+	Worker process initializer, the context of the worker's own pool comes
+	through the fork along with the dictionary index
+	"""
+
+	global _shard_context
+
+	_shard_context = context
+
+
+def _reduce_shard(length, shard, predicate, exclusion):
+	"""
+	Worker function, filters a shard of a word set and tallies the kept words
+
+	Returns: (kept ids, counts, order) tuple, the kept word ids as a string of
+	the array and the partial tally, see HangmanLetterTally.count_partial
+	"""
+
+	presence, positions = _shard_context.masks(length)
+	letters = _shard_context.letters(length)
+
+	ids = array('I')
+	ids.fromstring(shard)
+
+	keep = predicate.keep(presence, positions)
+
+	kept = array('I', [word_id for word_id in ids if keep(word_id)])
+
+	counts, order = HangmanLetterTally.count_partial(letters, presence, kept, exclusion)
+
+	return (kept.tostring(), counts, order)
+
+
+class HangmanShardPool:
+	"""
+	Worker processes sharing the reduce of one large word set, to cut the
+	latency of the first turns of games on the biggest length buckets.
+
+	The word set is split into one consecutive shard per worker.  Each worker
+	filters its shard with the game state predicate (see HangmanPatternPredicate)
+	and returns the kept word ids along with their partial letter tally, the
+	coordinator concatenates the ids and merges the tallies in shard order, so
+	the word set and its tally are the ones of a single process reduce.
+
+	The pool is forked once the dictionary context's per-length data is built,
+	the workers share it copy-on-write and only receive the shard word ids.
+	Each pool hands its context to its own workers through the pool
+	initializer, so pools of several dictionaries don't mix up their contexts.
+	Word sets smaller than the threshold are not worth the round trips and are
+	reduced in process, no pool is forked when no length bucket reaches it.
+
+	Used by HangmanMemoryPassEngine through HangmanEngineContext.shard_pool.
+	"""
+
+	def __init__(self, context, workers, threshold):
+
+		self._context = context
+		self._workers = workers
+		self._threshold = threshold
+		self._pool = multiprocessing.Pool(workers, _init_shard_worker, (context,))
+
+
+	@staticmethod
+	def start(settings, context):
+		"""
+		Fork the shard pool of the settings for the dictionary context, once
+		the engine's per-length data is built
+
+		Returns: The pool, also set as the context's shard pool, None when
+		the settings don't shard or no word set can reach the threshold
+		"""
+
+		if settings.shards == 0: return None
+
+		# word sets only shrink from their whole length bucket
+		largest = max([len(context.bucket(length)) for length in context.word_index.lengths()] or [0])
+
+		if largest < settings.shard_threshold:
+			settings.display.clock("No word set reaches {} words, not sharding", settings.shard_threshold)
+			return None
+
+		HangmanLetterStrategy.prepare_engine(settings, context)
+
+		#the forked workers would write the lines buffered so far again
+		settings.display.flush()
+		settings.display.clock("Forking {} shard workers", settings.shards)
+
+		shard_pool = HangmanShardPool(context, settings.shards, settings.shard_threshold)
+		context.set_shard_pool(shard_pool)
+
+		return shard_pool
+
+
+	def close(self):
+		"""
+		Stop the workers, the context's reduces run in process again
+		"""
+
+		if self._context.shard_pool is self: self._context.set_shard_pool(None)
+
+		self._pool.terminate()
+		self._pool.join()
+
+
+	@property
+	def workers(self):
+		return self._workers
+
+	@property
+	def threshold(self):
+		return self._threshold
+
+
+	def reduce(self, length, ids, predicate, exclusion):
+		"""
+		Reduce a word set across the workers
+
+		Args:
+			length - word length of the word set
+			ids - word ids of the word set, an array('I')
+			predicate - the game state, see HangmanPatternPredicate
+			exclusion - letters ignored by the tally
+
+		Returns: (kept ids, tally) tuple, the kept word ids in word set order
+		"""
+
+		step = -(-len(ids) // self._workers)
+
+		results = [self._pool.apply_async(_reduce_shard, \
+			(length, ids[i:i + step].tostring(), predicate, exclusion)) \
+			for i in xrange(0, len(ids), step)]
+
+		kept = array('I')
+		partials = []
+
+		for result in results:
+			shard_kept, counts, order = result.get()
+
+			kept.fromstring(shard_kept)
+			partials.append((counts, order))
+
+		return (kept, HangmanLetterTally.merge(partials))
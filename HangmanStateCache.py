@@ -0,0 +1,88 @@
+import threading
+
+from collections import OrderedDict
+
+
+class HangmanStateCache:
+	"""
+	Bounded least recently used cache, evicting by memory footprint.
+
+	Every entry is stored with its (estimated) size in bytes.  When the total
+	size goes over the budget the least recently used entries are evicted.
+	Keeps hit/miss/eviction counters for inspection.  Thread-safe.
+
+	Used by HangmanLetterStrategy to share reduced game states across games.
+	"""
+
+	def __init__(self, max_bytes):
+
+		self._max_bytes = max_bytes
+		self._entries = OrderedDict()
+		self._size_bytes = 0
+		self._lock = threading.Lock()
+
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+
+	def get(self, key):
+		"""
+		Returns: The cached value for key (marking it most recently used)
+		or None if not cached
+		"""
+
+		with self._lock:
+			entry = self._entries.pop(key, None)
+
+			if entry == None:
+				self.misses += 1
+				return None
+
+			self._entries[key] = entry
+			self.hits += 1
+
+			return entry[0]
+
+
+	def put(self, key, value, size_bytes):
+		"""
+		Cache value under key, evicting least recently used entries
+		until the cache fits its byte budget again.  Values larger than
+		the whole budget are not cached
+		"""
+
+		if size_bytes > self._max_bytes: return
+
+		with self._lock:
+			previous = self._entries.pop(key, None)
+
+			if previous != None: self._size_bytes -= previous[1]
+
+			self._entries[key] = (value, size_bytes)
+			self._size_bytes += size_bytes
+
+			while self._size_bytes > self._max_bytes:
+				_, (_, evicted_size) = self._entries.popitem(last=False)
+				self._size_bytes -= evicted_size
+				self.evictions += 1
+
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self._size_bytes = 0
+
+
+	@property
+	def size_bytes(self):
+		return self._size_bytes
+
+
+	def __len__(self):
+		return len(self._entries)
+
+
+	def __str__(self):
+		return "entries={}, bytes={}, hits={}, misses={}, evictions={}".format( \
+			len(self._entries), self._size_bytes, self.hits, self.misses, self.evictions)
@@ -0,0 +1,100 @@
+import timeit
+
+from Hangman import Hangman
+from HangmanLetterStrategy import HangmanLetterStrategy
+from HangmanTallyCache import HangmanTallyCache
+from HangmanPhaseTimings import HangmanPhaseTimings
+
+
+class HangmanStrategyBenchmark:
+	"""
+	Plays the same secrets through each letter selection strategy and
+	reports their average score, games per second and per turn latency
+	side by side.
+
+	Each strategy starts with an empty game state cache.  The engine's per-length
+	data and the first pass tallies are built before timing, so no strategy
+	pays for them.
+	"""
+
+	_HEADER = "{:<14} {:>6} {:>10} {:>10} {:>14} {:>13} {:>13}"
+	_ROW = "{:<14} {:>6} {:>10.4f} {:>10.1f} {:>14.3f} {:>13.3f} {:>13.3f}"
+
+
+	def __init__(self, settings, context, strategy_names = None):
+
+		if strategy_names == None: strategy_names = HangmanLetterStrategy.strategy_names()
+
+		self._settings = settings
+		self._context = context
+		self._strategy_names = strategy_names
+
+
+	def run(self, secrets):
+		"""
+		Play the secrets with every strategy
+
+		Returns: list of (strategy name, games, average score, games per second,
+		mean, 95th percentile and max turn latency in milliseconds) tuples
+		"""
+
+		settings = self._settings
+		context = self._context
+
+		HangmanLetterStrategy.prepare_engine(settings, context)
+		HangmanTallyCache(None).build(context)
+
+		results = []
+
+		for name in self._strategy_names:
+			settings.display.clock("Benchmarking strategy {}", name)
+
+			context.state_cache.clear()
+
+			total, count, turns = 0, 0, []
+
+			start = timeit.default_timer()
+
+			for secret in secrets:
+				hangman = Hangman(settings, None, context, name)
+
+				total += hangman.play(secret, settings.max_incorrect)
+				count += 1
+
+				turns.extend(hangman.turn_seconds)
+
+			elapsed = timeit.default_timer() - start
+
+			results.append((name, count, float(total) / max(count, 1), count / elapsed) + \
+				HangmanStrategyBenchmark.__latencies(turns))
+
+		return results
+
+
+	def report(self, results):
+		"""
+		Display the benchmark results as a table, one strategy per row
+		"""
+
+		display = self._settings.display
+
+		display.bare(HangmanStrategyBenchmark._HEADER.format('strategy', 'games', \
+			'avg score', 'games/sec', 'turn mean ms', 'turn p95 ms', 'turn max ms'))
+
+		for result in results:
+			display.bare(HangmanStrategyBenchmark._ROW.format(*result))
+
+
+	@staticmethod
+	def __latencies(turns):
+		"""
+		Returns: (mean, 95th percentile, max) of the turn latencies in milliseconds
+		"""
+
+		if len(turns) == 0: return (0.0, 0.0, 0.0)
+
+		turns = sorted(turns)
+
+		p95 = HangmanPhaseTimings.percentile(turns, 95)
+
+		return (1000 * sum(turns) / len(turns), 1000 * p95, 1000 * turns[-1])
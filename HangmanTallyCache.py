@@ -0,0 +1,147 @@
+import marshal
+import os
+import sys
+import zlib
+
+from collections import Counter
+
+from HangmanLetterStrategy import HangmanLetterStrategy
+
+
+class HangmanTallyCache:
+	"""
+	Persistent cache of the first pass tallies across program runs.
+
+	Holds the (pass_size, tally) of every word length bucket of the dictionary
+	and the first guess letter the strategy picks from it, stored marshalled and
+	zlib compressed along with the dictionary content hash.  Loading it into the
+	dictionary context lets the pass engines skip the tally pass over the whole
+	length bucket in setup.  A cache built from a different dictionary is stale
+	and ignored.
+	"""
+
+	_FORMAT_VERSION = 1
+
+	def __init__(self, name):
+		self._name = name
+
+
+	def load(self, context):
+		"""
+		Load the cached tallies into the dictionary context
+
+		Returns: True if loaded, False if the cache file is missing, unreadable
+		or was built from a different dictionary
+		"""
+
+		try:
+			with open(self._name, 'rb') as fd:
+				header, entries = marshal.loads(zlib.decompress(fd.read()))
+
+			version, content_hash = header
+
+		except (IOError, EOFError, ValueError, TypeError, zlib.error):
+			return False
+
+		if version != HangmanTallyCache._FORMAT_VERSION: return False
+
+		if content_hash != context.word_index.content_hash: return False
+
+		for length, (pass_size, items, first_guess) in entries.iteritems():
+
+			# restore the counter in the letter order of the tally pass
+			tally = Counter()
+			for letter, count in items: tally[letter] = count
+
+			context.cache_letter_counts(length, pass_size, tally, first_guess)
+
+		return True
+
+
+	def build(self, context):
+		"""
+		Tally the first pass of every word length not tallied yet and store
+		the tallies along with their first guess in the dictionary context
+		"""
+
+		for length in context.word_index.lengths():
+
+			counter_tuple = context.letter_counts(length)
+
+			if counter_tuple == None:
+				bucket = context.bucket(length)
+				pass_size, tally = len(bucket), HangmanTallyCache.__tally(bucket)
+			else:
+				pass_size, tally = counter_tuple
+
+			first_guess = HangmanTallyCache.__first_guess(pass_size, tally)
+
+			context.cache_letter_counts(length, pass_size, tally, first_guess)
+
+
+	def save(self, context):
+		"""
+		Write the tallies of the dictionary context to the cache file
+		"""
+
+		entries = {}
+
+		for length in context.word_index.lengths():
+
+			counter_tuple = context.letter_counts(length)
+
+			if counter_tuple == None: continue
+
+			pass_size, tally = counter_tuple
+
+			entries[length] = (pass_size, tally.items(), context.first_guess(length))
+
+		header = (HangmanTallyCache._FORMAT_VERSION, context.word_index.content_hash)
+
+		try:
+			cachedir = os.path.dirname(self._name)
+
+			if cachedir != '' and not os.path.isdir(cachedir): os.makedirs(cachedir)
+
+			with open(self._name, 'wb') as fd:
+				fd.write(zlib.compress(marshal.dumps((header, entries)), 9))
+
+		except (IOError, OSError) as e:
+			print >> sys.stderr, 'Operation failed: %s' % e
+
+
+	@staticmethod
+	def __tally(bucket):
+		"""
+		Tally the unique word letters of the bucket in word order, as the pass engines do
+		"""
+
+		tally = Counter()
+
+		for word in bucket:
+			processed = set()
+
+			for letter in word:
+				if letter not in processed:
+					tally[letter] += 1
+					processed.add(letter)
+
+		return tally
+
+
+	@staticmethod
+	def __first_guess(pass_size, tally):
+		"""
+		Returns: The letter the strategy guesses first given the tally,
+		None if the word set is too small for a letter guess
+		"""
+
+		if pass_size < 2: return None
+
+		# the strategy works on its own counter of the tally, see set_letter_counts
+		letter_counts = Counter()
+		letter_counts += tally
+
+		letter, _ = HangmanLetterStrategy.select_letter(letter_counts, pass_size)
+
+		return letter
@@ -0,0 +1,117 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import thread
+import time
+
+
+class _timespec(ctypes.Structure):
+	_fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+def _monotonic_clock():
+	"""
+	Returns: Function returning the monotonic clock in integer nanoseconds through
+	clock_gettime, or the wall clock scaled to nanoseconds if not available
+	"""
+
+	try:
+		libc = ctypes.CDLL(ctypes.util.find_library('rt') or ctypes.util.find_library('c'))
+
+		clock_gettime = libc.clock_gettime
+		clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_timespec)]
+
+		CLOCK_MONOTONIC = 1
+		timespec = _timespec()
+		timespec_ref = ctypes.byref(timespec)
+
+		def now():
+			clock_gettime(CLOCK_MONOTONIC, timespec_ref)
+			return timespec.tv_sec * 1000000000 + timespec.tv_nsec
+
+		now()
+
+		return now
+
+	except (OSError, AttributeError, TypeError):
+		return lambda: int(time.time() * 1000000000)
+
+
+class HangmanTracer:
+	"""
+	Span tracer of the game play, written as Chrome trace event JSON
+	(load it in chrome://tracing or Perfetto).
+
+	A span is recorded once it ends, from its start timestamp, with a name
+	and attributes e.g. the candidates in and out of a reduce:
+
+		tracer = display.tracer
+
+		if tracer != None: start = tracer.now()
+		...
+		if tracer != None: tracer.complete('reduce', start, {'in': 100, 'out': 7})
+
+	Timestamps are integer nanoseconds of the monotonic clock.  The tracer
+	lives on HangmanDisplay and is None when tracing is disabled, so the
+	instrumented code only pays a None check.  Spans of worker threads are
+	recorded with their thread id, worker processes are not traced.
+	"""
+
+	now = staticmethod(_monotonic_clock())
+
+
+	def __init__(self):
+
+		self._pid = os.getpid()
+		self._events = []
+
+
+	def complete(self, name, start, args = None):
+		"""
+		Record the span name started at start (see now) and ending now
+		"""
+		self._events.append((name, start, HangmanTracer.now() - start, thread.get_ident(), args))
+
+
+	def instant(self, name, args = None):
+		"""
+		Record the instant event name, e.g. a display.clock message
+		"""
+		self._events.append((name, HangmanTracer.now(), None, thread.get_ident(), args))
+
+
+	def __len__(self):
+		return len(self._events)
+
+
+	def save(self, name):
+		"""
+		Write the recorded events as a Chrome trace event JSON file,
+		timestamps and durations in (fractional) microseconds
+		"""
+
+		events = []
+
+		for event_name, start, duration, tid, args in self._events:
+
+			event = {'name': event_name, 'cat': 'hangman', 'pid': self._pid, 'tid': tid, \
+				'ts': start / 1000.0}
+
+			if duration == None:
+				event['ph'] = 'i'
+				event['s'] = 't'
+			else:
+				event['ph'] = 'X'
+				event['dur'] = duration / 1000.0
+
+			if args != None: event['args'] = args
+
+			events.append(event)
+
+		try:
+			with open(name, 'w') as fd:
+				json.dump({'traceEvents': events, 'displayTimeUnit': 'ns'}, fd)
+
+		except IOError as e:
+			print 'Operation failed: %s' % e
@@ -0,0 +1,71 @@
+from Guess import GuessLetter
+from Guess import GuessWord
+
+
+class HangmanTreeStrategy:
+	"""
+	Letter strategy component of game play backed by a compiled HangmanDecisionTree.
+
+	Plays the same guesses as HangmanLetterStrategy with one tree lookup per turn,
+	no word set filtering or tallying.  A missing tree node means no dictionary
+	word fits the game state, reported the same way HangmanLetterStrategy reports
+	an exhausted word set
+	"""
+
+	def __init__(self, game, settings, tree):
+
+		self._display = settings.display
+		self._node = tree.root(game.get_secret_word_length())
+		self._last_guess = None
+
+
+	def close(self):
+		pass
+
+
+	def next_guess(self, game):
+		"""
+		Follow the tree edge of the last guess outcome and retrieve the next guess
+
+		Args:
+			self
+			game - instance of HangmanGame
+
+		Returns:
+			guess - either GuessLetter or GuessWord
+			error - any particular error info
+		"""
+		assert(game != None)
+
+		guess, error = None, None
+
+		if self._node != None and self._last_guess != None:
+			_, children = self._node
+
+			if children == None:
+				# the final word was already guessed
+				self._node = None
+			else:
+				hangman_pattern = game.get_guessed_so_far().lower()
+
+				# Bitmask of the pattern positions revealed for the last guessed letter
+				revealed = 0
+				for i in range(len(hangman_pattern)):
+					if hangman_pattern[i] == self._last_guess: revealed |= 1 << i
+
+				self._node = children.get(revealed)
+
+		if self._node == None:
+			error = "Game over, exhausted all words, word not in dictionary"
+
+		else:
+			self._last_guess, children = self._node
+
+			if children == None:
+				guess = GuessWord(self._last_guess)
+			else:
+				guess = GuessLetter(self._last_guess)
+
+		self._display.normal(guess)
+
+		return guess, error
@@ -0,0 +1,277 @@
+import binascii
+import hashlib
+import re
+import threading
+
+from array import array
+
+
+class HangmanWordIndex:
+	"""
+	Resident index of the dictionary words arranged by word length.
+
+	The dictionary file is read once, each word normalized (stripped and lowercased)
+	and appended to the bucket for its length.  Words with characters other than
+	letters a to z (e.g. it's) can't be encoded and are skipped.  Buckets keep the
+	dictionary file ordering.  Access to a length bucket is a single dict lookup.
+
+	Each bucket also has a letter bitmask encoding, built once on first use:
+		presence - per word 26-bit mask of the letters the word contains
+		positions - per letter, per word bitmask of the positions holding the letter
+
+	the unique letters of each word, in the order they first appear in the word,
+	and inverted posting lists, as integer bitsets over the bucket word ids:
+		containing - per letter, the words containing the letter
+		at - per position, per letter, the words with the letter at that position
+
+	The words never change once indexed, the lazily built encodings are
+	guarded by a lock so the index can be shared by concurrent games.
+
+	Used by HangmanWordPassEngine in place of re-reading a sorted dictionary file.
+	"""
+
+	LETTER_BASE = ord('a')
+
+	#Characters a dictionary word can't hold
+	INVALID = re.compile('[^a-z]')
+
+	def __init__(self, words_stream, content_hash = None):
+
+		self._content_hash = content_hash
+		self._buckets = {}
+		self._masks = {}
+		self._postings = {}
+		self._letters = {}
+		self._lock = threading.Lock()
+		self._size = 0
+		self._skipped = 0
+
+		invalid = HangmanWordIndex.INVALID
+
+		for word in words_stream:
+			if len(word) == 0: continue
+
+			if invalid.search(word) != None:
+				self._skipped += 1
+				continue
+
+			bucket = self._buckets.get(len(word))
+
+			if bucket == None:
+				bucket = self._buckets[len(word)] = []
+
+			bucket.append(word)
+			self._size += 1
+
+
+	@staticmethod
+	def from_dictfile(name):
+		"""
+		Build the index from the dictionary file name
+		Assuming the dictionary words are well formed words and unique,
+		raw word lists are cleaned up by HangmanDictionaryIngest
+		"""
+
+		with open(name) as fd:
+			data = fd.read()
+
+		return HangmanWordIndex.from_content(data)
+
+
+	@staticmethod
+	def from_content(data, content_hash = None):
+		"""
+		Build the index from the content of a dictionary file already read,
+		along with its content hash if already computed
+		"""
+
+		if content_hash == None: content_hash = hashlib.md5(data).hexdigest()
+
+		return HangmanWordIndex((wordline.strip().lower() for wordline in data.splitlines()), \
+			content_hash)
+
+
+	def bucket(self, length):
+		"""
+		Returns: The list of dictionary words of the given length
+		(empty if there are none)
+		"""
+		return self._buckets.get(length, [])
+
+
+	def masks(self, length):
+		"""
+		Returns: The (presence, positions) letter bitmask encoding of the words
+		of the given length.  Both are indexed by word id (position in the bucket),
+		positions is indexed by letter code first e.g. positions[code][word_id]
+		"""
+
+		encoding = self._masks.get(length)
+
+		if encoding != None: return encoding
+
+		with self._lock:
+			encoding = self._masks.get(length)
+
+			if encoding == None:
+				encoding = self._masks[length] = self.__encode_masks(length)
+
+		return encoding
+
+
+	def __encode_masks(self, length):
+
+		bucket = self.bucket(length)
+		base = HangmanWordIndex.LETTER_BASE
+
+		presence = array('L', [0]) * len(bucket)
+		positions = [array('L', [0]) * len(bucket) for _ in xrange(26)]
+
+		for word_id, word in enumerate(bucket):
+			present = 0
+			bit = 1
+
+			for letter in word:
+				code = ord(letter) - base
+				positions[code][word_id] |= bit
+				present |= 1 << code
+				bit <<= 1
+
+			presence[word_id] = present
+
+		return (presence, positions)
+
+
+	def letters(self, length):
+		"""
+		Returns: The list of unique letter strings of the words of the given
+		length, indexed by word id, each listing the letters of the word in
+		the order they first appear e.g. 'sos' -> 'so'
+		"""
+
+		letters = self._letters.get(length)
+
+		if letters != None: return letters
+
+		# outside the lock, the bucket may itself be built on first use
+		bucket = self.bucket(length)
+
+		with self._lock:
+			letters = self._letters.get(length)
+
+			if letters == None:
+				letters = self._letters[length] = \
+					[HangmanWordIndex.__unique_letters(word) for word in bucket]
+
+		return letters
+
+
+	@staticmethod
+	def __unique_letters(word):
+
+		unique = []
+
+		for letter in word:
+			if letter not in unique: unique.append(letter)
+
+		return ''.join(unique)
+
+
+	def postings(self, length):
+		"""
+		Returns: The (containing, at) posting list bitsets of the words of the
+		given length.  Bit i of a bitset is set when word id i is in the list,
+		containing is indexed by letter code, at by position then letter code
+		e.g. at[position][code]
+		"""
+
+		postings = self._postings.get(length)
+
+		if postings != None: return postings
+
+		with self._lock:
+			postings = self._postings.get(length)
+
+			if postings == None:
+				postings = self._postings[length] = self.__encode_postings(length)
+
+		return postings
+
+
+	def __encode_postings(self, length):
+
+		bucket = self.bucket(length)
+		base = HangmanWordIndex.LETTER_BASE
+		num_bytes = (len(bucket) + 7) >> 3
+
+		at_bytes = [[bytearray(num_bytes) for _ in xrange(26)] for _ in xrange(length)]
+
+		invalid = HangmanWordIndex.INVALID
+
+		for word_id, word in enumerate(bucket):
+			# subclasses supply their own buckets, a word outside a to z is in no list
+			if invalid.search(word) != None: continue
+
+			offset = word_id >> 3
+			bit = 1 << (word_id & 7)
+
+			for position, letter in enumerate(word):
+				at_bytes[position][ord(letter) - base][offset] |= bit
+
+		at = [[HangmanWordIndex.__to_bitset(b) for b in letters] for letters in at_bytes]
+
+		containing = [0] * 26
+
+		for letters in at:
+			for code in xrange(26):
+				containing[code] |= letters[code]
+
+		return (containing, at)
+
+
+	@staticmethod
+	def __to_bitset(little_endian_bytes):
+		"""
+		Convert a little endian bit array (bit i of byte i/8 is word id i)
+		into an integer bitset
+		"""
+
+		if len(little_endian_bytes) == 0: return 0
+
+		return int(binascii.hexlify(str(little_endian_bytes[::-1])), 16)
+
+
+	@property
+	def skipped(self):
+		"""
+		Returns: Number of dictionary words skipped for holding characters
+		other than letters a to z
+		"""
+		return self._skipped
+
+
+	@property
+	def content_hash(self):
+		"""
+		Returns: Hex digest of the dictionary file content the index was built from
+		(None when built from a plain words stream)
+		"""
+		return self._content_hash
+
+
+	def lengths(self):
+		"""
+		Returns: The sorted word lengths present in the dictionary
+		"""
+		return sorted(self._buckets.keys())
+
+
+	def __len__(self):
+		return self._size
+
+
+if __name__ == '__main__':
+	index = HangmanWordIndex(['mus', 'oses', 'sot', 'Triose'.lower()])
+
+	for length in index.lengths():
+		print("{}: {}".format(length, index.bucket(length)))
@@ -1,9 +1,13 @@
-import copy
 import itertools
 import os
 
+from array import array
 from collections import Counter
 
+from HangmanLetterTally import HangmanLetterTally
+from HangmanPatternPartition import HangmanPatternPartition
+from HangmanDictionaryRegistry import HangmanDictionaryRegistry
+
 """
 The facts:
 174k words ~ in words.txt
@@ -47,30 +51,48 @@ class HangmanWordPassEngine:
 	a correctly or incorrectly guessed letter along with other parameters. 
 	Manages intermediate pass data
 
+	The current word set lives in the pass files only.  A reduce streams the
+	previous pass into the next one, tallying the kept words as they are
+	written.  A wrong guess removes the fewer words, their ids are held in
+	memory instead, while they are the smaller side of the split, to update the
+	previous tally from them.
+
 	Used exclusively by HangmanLetterStrategy.
 	"""
 
-	#This dict contains the counts of all the characters in each of 
-	#the word length arranged word sets
-	_letter_counters = {}
 	_static_initalized = False
-	_sorted_dictfile = None
-	_passfile_A = None	
-	_passfile_B = None
+	#Default dictionary context of the process, built by initialize
+	_context = None
+	#Pass file pairs are per engine instance, numbered within the process
+	_pass_ids = itertools.count(1)
 	_unchanging_randval = '234902358039284234832893842'
 
 
 
-	def __init__(self, answer_length, settings, mystery_letter):
+	def __init__(self, answer_length, settings, mystery_letter, context):
 
 		self._settings = settings
 		self._display = settings.display		
 		self._answer_length = answer_length
 		self._mystery_letter = mystery_letter
+		self._context = context
+
+		# pass files carry word ids into the length bucket and its letter masks
+		self._bucket = context.bucket(answer_length)
+		self._presence, self._positions = context.masks(answer_length)
+		self._letters = context.letters(answer_length)
 		self._current_words_pipeline_readable = None
 		self._current_pass = 1
 		#self._regex_used = 0
 
+		#Tally of the current word set, updated from the smaller side of each reduce
+		self._tally = None
+		#Number of words of the current pass
+		self._pass_size = None
+		#Pass file holding the current pass, None before the first pass is written
+		self._previous_write_passfile = None
+		self._tally_path = None
+
 		self.__initialize_passes()
 
 
@@ -79,41 +101,54 @@ class HangmanWordPassEngine:
 		self._answer_length = None
 		self._display = None
 		self._settings = None
+		self._context = None
+		self._bucket = None
+		self._presence = None
+		self._letters = None
+		self._positions = None
 		self._current_words_pipeline_readable = None
 		self._current_write_passfile = None
 		self._current_read_passfile = None
 		self._previous_write_passfile = None
 		self._pass_cycle = None
+		self._tally = None
+
+
+	@property
+	def tally_path(self):
+		"""
+		Returns: How the last reduce tallied its word set,
+		HangmanLetterTally.DELTA or HangmanLetterTally.RECOUNT
+		"""
+		return self._tally_path
 
 
 	@staticmethod
-	#remove leftover files
+	#release the default dictionary context
 	def cleanup():
-		try:
-			if HangmanWordPassEngine._sorted_dictfile != None:
-				os.remove(HangmanWordPassEngine._sorted_dictfile.name)
-			if HangmanWordPassEngine._passfile_A != None: 
-				os.remove(HangmanWordPassEngine._passfile_A.name)
-			if HangmanWordPassEngine._passfile_B != None: 
-				os.remove(HangmanWordPassEngine._passfile_B.name)
-			
-			HangmanWordPassEngine._sorted_dictfile = None
-			HangmanWordPassEngine._passfile_A = None
-			HangmanWordPassEngine._passfile_B = None
+		if HangmanWordPassEngine._context != None:
+			HangmanDictionaryRegistry.default().release(HangmanWordPassEngine._context)
 
-			HangmanWordPassEngine._letter_counters.clear()
-			HangmanWordPassEngine._letter_counters = None
-		except OSError as e:
-			print 'Operation failed: %s' % e
+		HangmanWordPassEngine._context = None
+		HangmanWordPassEngine._static_initalized = False
 
 	@staticmethod
-	#sort the dictionary file and write it out
+	#read the dictionary file once and index its words by length
 	def initialize(settings):
 		
 		if HangmanWordPassEngine._static_initalized == False:
 
 			settings.display.clock("Statically Initializing engine 0.1")
-			HangmanWordPassEngine.__sort_and_write_dictfile_words(settings)
+
+			tracer = settings.display.tracer
+
+			if tracer != None: start = tracer.now()
+
+			HangmanWordPassEngine.__index_dictfile_words(settings)
+
+			if tracer != None:
+				tracer.complete('initialize', start, {'dictfile': settings.get_dictfile_name(), \
+					'words': len(HangmanWordPassEngine._context.word_index)})
 			
 			settings.display.clock("Statically Initializing engine 0.2\n")
 
@@ -121,6 +156,42 @@ class HangmanWordPassEngine:
 		HangmanWordPassEngine._static_initalized = True
 
 
+	@staticmethod
+	def context():
+		"""
+		Returns: The default dictionary context built by initialize
+		"""
+		return HangmanWordPassEngine._context
+
+
+	@staticmethod
+	def prepare(context, length):
+		"""
+		Build the shared per-length data used by the engine ahead of the games,
+		e.g. before forking worker processes so they share it
+		"""
+		context.masks(length)
+		context.letters(length)
+
+
+	def close(self):
+		"""
+		Remove the pass files of this engine, called once its game is over
+		"""
+
+		try:
+			for passfile in (self._passfile_A, self._passfile_B):
+				if passfile != None:
+					if not passfile.closed: passfile.close()
+					os.remove(passfile.name)
+
+		except OSError as e:
+			print 'Operation failed: %s' % e
+
+		self._passfile_A = None
+		self._passfile_B = None
+
+
 	def setup(self, letter_strategy):
 		"""
 		Setup the engine. Initialize word set and counter structures to accurately
@@ -133,20 +204,23 @@ class HangmanWordPassEngine:
 
 		counter = None
 
-		# access class static _letter_counters dict for possible cached copy of counter
-		counter_tuple = HangmanWordPassEngine._letter_counters.get(self._answer_length)
+		# access the shared context for possible cached copy of counter
+		counter_tuple = self._context.letter_counts(self._answer_length)
 
 		if counter_tuple != None: pass_size, counter = counter_tuple
 
 
 		if counter != None:
-			letter_strategy.set_letter_counts(pass_size, copy.deepcopy(counter))
+			letter_strategy.set_letter_counts(pass_size, counter)
+
+			self._tally = counter
+			self._pass_size = pass_size
 					
 			# Set first pass of dictionary words
 		
-			# grab the words from the sorted dictionary file using the get_dictfile_stream
+			# grab the word ids from the resident dictionary index
 			pass_A = \
-				(word for word in HangmanWordPassEngine.__get_grouped_words_stream(self._answer_length))
+				(word_id for word_id in self.__get_grouped_words_stream(self._answer_length))
 			
 			self._current_words_pipeline_readable = pass_A
 		
@@ -156,15 +230,15 @@ class HangmanWordPassEngine:
 
 			#file_pass_B = (word for word in self._settings.get_dictfile_words(self._answer_length))
 			pass_B = \
-				(word for word in HangmanWordPassEngine.__get_grouped_words_stream(self._answer_length))
+				(word_id for word_id in self.__get_grouped_words_stream(self._answer_length))
+
+			self._pass_size = len(self._bucket)
 
 			tally, pass_size, _ = self.__process_and_tally_filtered_stream(set(), pass_B)
 
 			letter_strategy.set_letter_counts(pass_size, tally)
 
-			counts_deepcpy = copy.deepcopy(tally)
-
-			HangmanWordPassEngine._letter_counters[self._answer_length] = (pass_size, counts_deepcpy)
+			self._context.cache_letter_counts(self._answer_length, pass_size, tally)
 
 		self._display.chatty("Finished setup")
 
@@ -172,17 +246,15 @@ class HangmanWordPassEngine:
 	def __initialize_passes(self):
 
 		try:
-			#make the log name hard to guess
-			id = HangmanWordPassEngine._unchanging_randval 
+			#make the log name hard to guess, and unique per process and engine
+			id = "{}_{}_{}".format(HangmanWordPassEngine._unchanging_randval, \
+				os.getpid(), next(HangmanWordPassEngine._pass_ids))
 
-			if HangmanWordPassEngine._passfile_A == None and \
-				HangmanWordPassEngine._passfile_B == None:
-				
-				# setup appropriate file streams for pass files
-				HangmanWordPassEngine._passfile_A = open("pass_" + id + "_A.log", 'w')
-				HangmanWordPassEngine._passfile_B = open("pass_" + id + "_B.log", 'w')
+			# setup appropriate file streams for pass files
+			self._passfile_A = open("pass_" + id + "_A.log", 'w')
+			self._passfile_B = open("pass_" + id + "_B.log", 'w')
 
-			pass_sequence = [HangmanWordPassEngine._passfile_A, HangmanWordPassEngine._passfile_B]
+			pass_sequence = [self._passfile_A, self._passfile_B]
 			
 			# setup cycle to alternate files for reading and writing
 			self._pass_cycle = itertools.cycle(pass_sequence)
@@ -196,15 +268,15 @@ class HangmanWordPassEngine:
 		''''
 		set_pass_params
 		Input tuple vector should be of following format
-		filter_params_tuple = (last_guess_correct, letter, hangman_pattern, hangman_tally, regex, exclusion)
+		filter_params_tuple = (last_guess_correct, letter, hangman_pattern, predicate, revealed, exclusion)
 
 		'input' vector in used to reduce the word space
 
 		last_guess_correct - last guess state (either correct or incorrect)
 		letter - the letter to reduce the word set space from
 		hangman_pattern - current hangman letter pattern state sequence
-		hangman_tally - counter of letters in hangman pattern w/o mystery letter
-		regex - compile regex object created from hangman_pattern
+		predicate - the game state compiled into a word filter, see HangmanPatternPredicate
+		revealed - bitmask of the hangman_pattern positions holding letter
 		exclusion - exclusion set of letters already guessed
 		'''
 
@@ -219,11 +291,11 @@ class HangmanWordPassEngine:
 		Returns tuple w/ updated state 
 		"""
 
-		last_guess_correct, guess, hangman_pattern, hangman_tally, regex, exclusion \
+		last_guess_correct, guess, hangman_pattern, predicate, revealed, exclusion \
 			 = self._current_pass_params
 
 		assert(last_guess_correct != None and guess != None and exclusion != None \
-			and hangman_pattern != None and hangman_tally != None and regex != None)
+			and hangman_pattern != None and predicate != None and revealed != None)
 
 		if last_guess_correct: 
 			updated_state_tuple = self.__filter_correct_guess()
@@ -233,34 +305,57 @@ class HangmanWordPassEngine:
 		return updated_state_tuple
 
 
-	def __possible_hangman_words(self):
+	def partition(self, exclusion):
 		"""
-		Generator function to iterate through the current hangman word pass sequence
+		Returns: The block sizes each letter not in the exclusion set would
+		split the current word set into, see HangmanPatternPartition
+		"""
+
+		return HangmanPatternPartition.partition(self._letters, self._positions, \
+			self.__pass_word_ids(), self._pass_size, exclusion)
+
+
+	def snapshot(self):
+		"""
+		The current word set lives in the pass files, which every game reuses,
+		so it can't be kept around for later games.
+		Returns: None, file passes are not cacheable
+		"""
+		return None
+
+
+	def restore(self, snapshot):
+		raise Exception("File pass engine state can't be restored")
+
+
+	def __possible_hangman_word_ids(self):
+		"""
+		Generator function to iterate through the current hangman word id pass sequence
 		"""
 
 		while True:
 			try:
 				words_iter = iter(self._current_words_pipeline_readable)
-				word = words_iter.next()
+				word_id = words_iter.next()
 
-				yield word
+				yield word_id
 			except StopIteration:
 				break;
 
 
-	def __process_and_tally_filtered_stream(self, exclusion, (filtered_stream)):
+	def __process_and_tally_filtered_stream(self, exclusion, (words_stream), keep = None, delta = False):
 		"""
-		Store the filtered word pass generator stream and tally the words while its being written to file.  
+		Store the word id pass generator stream filtered by keep and tally the words while its being written to file.  
 		"""
 
-		assert(filtered_stream != None)
+		assert(words_stream != None)
 
 		#write to the pass file
-		updated_state_tuple = self.__write_and_tally_stream(exclusion, filtered_stream)
+		updated_state_tuple = self.__write_and_tally_stream(exclusion, words_stream, keep, delta)
 
 		# store the lazy stream of the file
 		# grab the words from the recently output pass using the read_pass_stream function
-		self._current_words_pipeline_readable = (word for word in self.__read_pass_stream())
+		self._current_words_pipeline_readable = (word_id for word_id in self.__read_pass_stream())
 
 		return updated_state_tuple
 
@@ -278,203 +373,91 @@ class HangmanWordPassEngine:
 			Nothing
 		"""
 
-		_, wrong_letter, _, _, _, exclusion  = self._current_pass_params
+		_, _, _, predicate, _, exclusion  = self._current_pass_params
 
-		#generator comprehension to generate all words that don't have the letter
+		#keep all words that don't have the letter
 		#store the filtered pass
-		words_filtered_stream = (word for word in self.__possible_hangman_words() if word.find(wrong_letter) == -1)
+		keep = predicate.keep(self._presence, self._positions)
 
-		updated_state_tuple = self.__process_and_tally_filtered_stream(exclusion, words_filtered_stream)
+		updated_state_tuple = self.__process_and_tally_filtered_stream(exclusion, \
+			self.__possible_hangman_word_ids(), keep, True)
 
 		return updated_state_tuple
 
 	def __filter_correct_guess(self):
 		"""
 		Reduce the word set space, examining each candidate word from a stream
+		with a single integer compare of its precomputed letter position mask.
+
+		Earlier passes already pinned the positions of every previously guessed
+		letter (and removed words with wrong letters), so matching the guessed
+		letter's positions exactly also keeps the unknown slots free of the
+		exclusion set, as the full hangman pattern regex would.
 		Returns: Nothing
 		"""
 
-		words_filtered_stream = itertools.ifilter(None, \
-				itertools.imap(self.__filter_candidate_word_regex, self.__possible_hangman_words()))
+		_, _, _, predicate, _, exclusion  = self._current_pass_params
 
-		_, _, _, _, _, exclusion  = self._current_pass_params
+		#the positions of the guessed letter in the word must be exactly the revealed ones
+		keep = predicate.keep(self._presence, self._positions)
 
-		updated_state_tuple = self.__process_and_tally_filtered_stream(exclusion, words_filtered_stream)
+		updated_state_tuple = self.__process_and_tally_filtered_stream(exclusion, \
+			self.__possible_hangman_word_ids(), keep)
 
 		return updated_state_tuple
 
 
-	def __filter_candidate_word_regex(self, word):
-		"""
-		Determine if there is a match using the compiled regex and the candidate word
-		Much faster than the regular __filter_candidate_word
-		"""
-		
-		_, _, _, _, regex, _  = self._current_pass_params
-
-		if regex.match(word) == None: return False
-
-		return word
-		
-
-
-	def __filter_candidate_word(self, word):
-		"""
-		Reduce the word set space: 
-			a) knowing words not containing 'letter' are candidates for removal
-			b) words that don't have the same letter counts for 'letter' are candidates
-			c) words whose positions for 'letter' don't match are candidates
-		"""
-
-		_, correct_letter, hangman_pattern, hangman_tally, _, _  = self._current_pass_params
-
-		assert(word != None  and correct_letter != None and hangman_tally != None)
-
-		#if the correct letter is not found in the word, it can't be a candidate
-		if word.find(correct_letter) == -1: return False;
-
-		#if the correct hangman pattern letter counts don't match those of the word, it can't be a candidate
-		if self.__check_letter_counts_match(word, hangman_tally) == False: return False;
-
-		#if the correct hangman pattern letter positions don't match those of the word, it can't be a candidate
-		if self.__check_letter_positions_match(word, hangman_pattern) == False: return False;
-
-		#print 'HangmanWordPassEngine - filter candidate word - matches!!!', word
-
-		return word;
-
-
-	def __check_letter_counts_match(self, word, hangman_tally):
+	@staticmethod
+	def __index_dictfile_words(settings):
 		"""
-		Ensure the known letter counts, in the given word, match the letter counts in the tally
-	
-		Args:
-			self
-			word - given dictionary word
-			hangman_tally - tally of the known letter counts to check against
-
-		Returns:
-			boolean - True or False
+		Function to read the dictionary file once and keep its words
+		resident, arranged by word length, in the default dictionary context.
+		The context is acquired from the process dictionary registry, shared
+		with any other user of the same dictionary content.
+		Compiled dictionary files are mapped instead of read
+		Assuming the dictionary words are well formed words and unique
 		"""
 
-		assert(word != None and hangman_tally != None)
-
-		tally = copy.deepcopy(hangman_tally)
-
-		processed = set()
-
-		#iterate through the characters in the word
-		for i in range(len(word)):
-			letter = word[i]
+		try:
+			HangmanWordPassEngine._context = HangmanDictionaryRegistry.default().acquire( \
+				settings.get_dictfile_name(), settings.cache_bytes)
 
-			#Only care if the letter is in the counter
-			#Or has already been processed as having been in the counter
-			if tally[letter] != 0 or letter in processed: 
-				tally[letter] -= 1
-				processed.add(letter)
+		except IOError as e:
+			print 'Operation failed: %s' % e
 
-		if sum(tally.values()) != 0: 
-			return False
 
-		return True
+	#returns the ids of the words in the relevant word group arranged by length
+	def __get_grouped_words_stream(self, group_key):
 
+		return iter(xrange(len(self._context.bucket(group_key))))
 
-	def __check_letter_positions_match(self, word, hangman_pattern):
-		"""
-		Ensure the known letter positions in the hangman word match those in the given word
 	
-		Args:
-			self
-			word - given dictionary word
-			hangman - hangman secret word
-
-		Returns:
-			boolean - True or False
+	def __pass_word_ids(self):
 		"""
-
-		assert(word != None and hangman_pattern != None)
-
-		for i in range(len(hangman_pattern)):
-
-			if hangman_pattern[i] != self._mystery_letter and hangman_pattern[i] != word[i]:
-				return False
-
-		return True
-
-
-	@staticmethod
-	def __sort_and_write_dictfile_words(settings):
+		Returns: Iterator of the word ids of the current pass, read from its
+		pass file (the whole length bucket before the first pass is written)
 		"""
-		Function to read and then sort lines from dictionary file
-		Assuming the dictionary words are well formed words and unique
-		"""
-
-		try:
-			#make the log name hard to guess
-			id = HangmanWordPassEngine._unchanging_randval
 
-			fdr = open(settings.get_dictfile_name())
-			HangmanWordPassEngine._sorted_dictfile = open("sorted_dictionary_" + id + ".txt",'w')
+		if self._previous_write_passfile == None:
+			return iter(xrange(self._pass_size))
 
-			lines = fdr.readlines()
-			lines.sort(key=len)
-
-			map(HangmanWordPassEngine._sorted_dictfile.write, lines)
-			
-			fdr.close()
-
-			HangmanWordPassEngine._sorted_dictfile.close()
-
-		except IOError as e:
-			print 'Operation failed: %s' % e
+		return self.__read_passfile(self._previous_write_passfile.name)
 
 
 	@staticmethod
-	def __get_sorted_dict_stream():
+	def __read_passfile(name):
 		"""
-		Generator function to read each word (line) from sorted dictionary file
+		Generator function to read each word id (line) of a written pass file
 		"""
-		
-		#last_read_word = None
-
-		try:
-			if HangmanWordPassEngine._sorted_dictfile.closed: 
-				HangmanWordPassEngine._sorted_dictfile =\
-					open(HangmanWordPassEngine._sorted_dictfile.name)
-
-
-			with HangmanWordPassEngine._sorted_dictfile as fd:
-				for wordline in fd:
-					word = wordline.strip().lower()
-
-					#performance hit
-					#nice to have but not necessary given well-formed dictionary assumption
-					#since this is a sorted file we can easily skip duplicates just in case
-					#if last_read_word != None and last_read_word == word: continue
 
-					yield word
+		with open(name, 'r') as fd:
+			for wordline in fd:
+				yield int(wordline)
 
-					#last_read_word = word
 
-
-		except IOError as e:
-			print 'gd Operation failed: %s' % e
-
-	@staticmethod
-	#acquires the sorted dictionary stream and returns the word in relevant word group arranged by length
-	def __get_grouped_words_stream(group_key):
-		
-		for key, igroup in \
-			itertools.groupby(HangmanWordPassEngine.__get_sorted_dict_stream(), lambda x: len(x)):
-   			
-   			if group_key == key: 
-   				for word in igroup:
-   					yield word
-
-	
 	def __read_pass_stream(self):
 		"""
-		Generator function to read each word (line) from pass file
+		Generator function to read each word id (line) from pass file
 		"""
 
 		self._current_read_passfile = self._previous_write_passfile
@@ -485,34 +468,56 @@ class HangmanWordPassEngine:
 
 			with self._current_read_passfile as fd:
 				for wordline in fd:
-					word = wordline.strip()
+					word_id = int(wordline)
 
-					#self._display.chatty("read_passfile {}, word: {}".format(self._current_read_passfile, word))
+					#self._display.chatty("read_passfile {}, word: {}".format(self._current_read_passfile, word_id))
 
-					yield word
+					yield word_id
 
 		except IOError as e:
 			print 'rp Operation failed: %s' % e
 
 
 
-	def __write_and_tally_stream(self, exclusion, (words_stream)):
+	def __write_and_tally_stream(self, exclusion, (words_stream), keep = None, delta = False):
 		"""
-		Function to write each word from a generator strean to a pass file
+		Function to write each word id kept from a generator strean to a pass file
 		Tallies the words stream while they are being written (saving an extra file read)
 
 		By "tally" - specifically, tally the unique word letters
 		Given a word, tally the various letters in the word by uniqueness.  
 	 	If there are two a's in a word record only 1 a.  If an exclusion set is 
 	 	provided, ignore the letters found in the exclusion set e.g. already guessed letters.
+
+		With delta (a wrong guess, which removes the fewer words) the removed ids
+		are held in memory instead, while they can still be the smaller side, and
+		the previous tally is updated from them, see HangmanLetterTally.  Its
+		letter ordering walk reads the kept ids back from the new pass file, only
+		until every letter is seen; the pass file is read back in full only when
+		the removed words turn out the larger side and the kept ones are recounted.
 		"""
 
 		assert(exclusion != None and words_stream != None)
 
-		tally = Counter()
-
-		word_num = -1
+		kept = 0
 		last_word = None
+		written = 0
+
+		letters = self._letters
+		excluded = ''.join(exclusion)
+
+		# beyond half the previous pass the removed words are the larger side
+		if delta and self._tally != None and self._pass_size != None:
+			tally = None
+			removed = array('I')
+			max_removed = self._pass_size // 2
+		else:
+			tally = Counter()
+			removed = None
+
+		tracer = self._display.tracer
+
+		if tracer != None: start = tracer.now()
 
 		self._current_write_passfile = next(self._pass_cycle)
 
@@ -525,29 +530,30 @@ class HangmanWordPassEngine:
 			#self._display.clock("write and tally passfile 1.23")
 
 			with self._current_write_passfile as fd:
-				for word_num, word in enumerate(iter(words_stream)):
+				for word_id in iter(words_stream):
 
-					#self._display.chatty("write_passfile {}, word: {}".format(self._current_write_passfile, word))
+					if keep != None and keep(word_id) == False:
+						if removed != None:
+							if len(removed) < max_removed:
+								removed.append(word_id)
+							else:
+								removed = None
 
-					fd.write("{}\n".format(word))
+						continue
 
-					#self._display.clock("write and tally passfile 1.24{}".format(word_num))
+					#self._display.chatty("write_passfile {}, word: {}".format(self._current_write_passfile, word_id))
 
+					fd.write("{}\n".format(word_id))
 
-					processed = set()
+					if tally != None:
+						for letter in letters[word_id].translate(None, excluded):
+							tally[letter] += 1
 
-					for i in range(len(word)):
-						letter = word[i]
-						
-						if exclusion != None and letter in exclusion: 
-							continue
+					if kept == 0: last_word = word_id
 
-						if letter not in processed:	
-							tally[letter] += 1
-							processed.add(letter)
+					kept += 1
 
-				if word_num + 1 == 1: 
-					last_word = word
+				if tracer != None: written = fd.tell()
 
 			#self._display.clock("write and tally passfile 1.25")
 
@@ -556,4 +562,30 @@ class HangmanWordPassEngine:
 
 		self._previous_write_passfile = self._current_write_passfile
 
-		return (tally, word_num + 1, last_word)
+		previous_size = self._pass_size
+		self._pass_size = kept
+
+		if tracer != None:
+			tracer.complete('filter', start, {'in': previous_size, \
+				'out': kept, 'bytes': written})
+			start = tracer.now()
+
+		if tally != None:
+			self._tally_path = HangmanLetterTally.RECOUNT
+		else:
+			tally, self._tally_path = HangmanLetterTally.update(self._tally, \
+				letters, self._presence, self.__pass_word_ids(), removed, exclusion, kept)
+
+		if tracer != None:
+			tracer.complete('tally', start, {'path': self._tally_path, 'words': kept})
+
+		self._tally = tally
+
+		self._display.chatty("Tallied {} kept words by {}", kept, self._tally_path)
+
+		if kept == 1: 
+			last_word = self._bucket[last_word]
+		else:
+			last_word = None
+
+		return (tally, kept, last_word)
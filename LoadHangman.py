@@ -0,0 +1,49 @@
+import argparse
+
+from HangmanDisplay import HangmanDisplay
+from HangmanSettings import HangmanSettings
+from HangmanLoadGenerator import HangmanLoadGenerator
+
+
+if __name__ == '__main__':
+	"""
+	Driver code to load a ServeHangman guess service with games and measure
+	its requests per second and latency
+	"""
+
+	parser = argparse.ArgumentParser(prog='LoadHangman',
+		description='Play hangman secrets through a guess service. ' \
+		+ 'E.g. python LoadHangman.py --batch words.txt --clients 8')
+
+	parser.add_argument('--host', dest='host', type=str, default='127.0.0.1',
+		help='service address')
+
+	parser.add_argument('--port', dest='port', type=int, default=8765,
+		help='service port')
+
+	parser.add_argument('--clients', dest='clients', type=int, default=8,
+		help='number of concurrent client connections')
+
+	parser.add_argument('--batch', dest='batchfile', type=argparse.FileType('r'),
+		help='secrets file name, the baseline secrets by default')
+
+	parser.add_argument('--dictionary', dest='dictionary', type=str,
+		help='dictionary the games are played against, the service default by default')
+
+	parser.add_argument('--repeat', dest='repeat', type=int, default=1,
+		help='number of times the secrets are played')
+
+	args = parser.parse_args()
+
+	display = HangmanDisplay(HangmanDisplay._NONE)
+
+	if args.batchfile != None:
+		with args.batchfile as fd:
+			secrets = [line.strip().lower() for line in fd if len(line.strip()) > 0]
+	else:
+		secrets = list(HangmanSettings._BASELINE)
+
+	generator = HangmanLoadGenerator(args.host, args.port, max(1, args.clients), \
+		HangmanSettings._MAX_WRONGGUESSES, args.dictionary)
+
+	HangmanLoadGenerator.report(generator.run(secrets * args.repeat), display)
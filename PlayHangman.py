@@ -1,6 +1,32 @@
+import sys
+
 from HangmanSettings import HangmanSettings
 from Hangman import Hangman
 from HangmanWordPassEngine import HangmanWordPassEngine
+from HangmanDecisionTree import HangmanDecisionTree
+from HangmanParallelRunner import HangmanParallelRunner
+from HangmanMappedWordIndex import HangmanMappedWordIndex
+from HangmanDictionaryIngest import HangmanDictionaryIngest
+from HangmanTallyCache import HangmanTallyCache
+from HangmanStrategyBenchmark import HangmanStrategyBenchmark
+from HangmanBatchResults import HangmanBatchResults
+from HangmanDictionaryEvaluation import HangmanDictionaryEvaluation
+from HangmanShardPool import HangmanShardPool
+
+
+def play_secrets(settings, tree, context, secrets):
+	"""
+	Generator function that plays the secrets one after the other and yields
+	(secret, score, record) tuples, the same as HangmanParallelRunner.play
+	"""
+
+	records = settings.resultsfile != None
+
+	for secret in secrets:
+		hangman = Hangman(settings, tree, context)
+		score = hangman.play(secret, settings.max_incorrect)
+
+		yield secret, score, hangman.record() if records else None
 
 
 if __name__ == '__main__':
@@ -18,28 +44,146 @@ if __name__ == '__main__':
 
 	display.clock("Start time")
 
+	if settings.ingest_dictfile != None:
+		# Clean up the raw word list into a dictionary file, no game play
+		ingest = HangmanDictionaryIngest(display, settings.ingest_bytes)
+		ingest.ingest(settings.get_dictfile_name(), settings.ingest_dictfile)
+
+		display.bare("Ingested {}", ingest)
+		display.clock("End time")
+		sys.exit(0)
+
+	if settings.compile_dictfile != None:
+		# Compile the dictionary for mapped loading, no game play
+		HangmanMappedWordIndex.compile(settings.get_dictfile_name(), settings.compile_dictfile)
+
+		display.clock("End time")
+		sys.exit(0)
+
 	HangmanWordPassEngine.initialize(settings)
 
-	# Grab the given secret from the generator function to start the game play!
-	# No more secrets, no more play
-	for secret in settings.get_secrets():
+	context = HangmanWordPassEngine.context()
+
+	if settings.build_treefile != None:
+		# Compile the decision trees of the dictionary, no game play
+		tree = HangmanDecisionTree.compile(context.word_index, max_incorrect, display)
+		tree.save(settings.build_treefile)
+
+		display.clock("End time")
+		HangmanWordPassEngine.cleanup()
+		sys.exit(0)
+
+	tree = None
+
+	if settings.treefile != None:
+		if settings.strategy != 'hybrid':
+			raise Exception("Decision trees replay the hybrid strategy only")
+
+		tree = HangmanDecisionTree.load(settings.treefile)
+		tree.validate(context.word_index, max_incorrect)
+
+		display.clock("Loaded decision tree")
+
+	elif settings.tally_cachefile != None:
+		# Reuse the first pass tallies of earlier runs, tally them all once otherwise
+		tally_cache = HangmanTallyCache(settings.tally_cachefile)
+
+		if tally_cache.load(context) == False:
+			tally_cache.build(context)
+			tally_cache.save(context)
+
+			display.clock("Built first pass tallies")
+		else:
+			display.clock("Loaded first pass tallies")
 
-		hangman = Hangman(settings)
-		
-		score = hangman.play(secret, max_incorrect)
-		total += score
-		count += 1
+	if settings.evaluate:
+		# Score every dictionary word at once, no game play
+		evaluation = HangmanDictionaryEvaluation(context.word_index, max_incorrect, settings.strategy)
 
-		display.bare("{}: {}\n".format(secret.upper(), score))
+		lengths = {}
 
-		#display.clock("Finished game\n")
+		for word, score in evaluation.evaluate(display):
+			display.normal("{}: {}", word.upper(), score)
 
+			stats = lengths.setdefault(len(word), [0, 0])
+			stats[0] += 1
+			stats[1] += score
 
-	# Compute the average score
-	avg = float(total) / float(count)
+			total += score
+			count += 1
+
+		for length, (words, length_total) in sorted(lengths.iteritems()):
+			display.bare("Length {}: {} words, average word score is {:.4f}", \
+				length, words, float(length_total) / words)
+
+		display.bare("Evaluated {} words, average word score is {}", count, float(total) / max(count, 1))
+
+		display.clock("End time")
+		HangmanWordPassEngine.cleanup()
+		sys.exit(0)
+
+	if settings.benchmark:
+		# Compare the letter strategies on the secrets, no regular game play
+		benchmark = HangmanStrategyBenchmark(settings, context)
+		benchmark.report(benchmark.run(list(settings.get_secrets())))
+
+		display.clock("End time")
+		HangmanWordPassEngine.cleanup()
+
+		if settings.tracefile != None: display.tracer.save(settings.tracefile)
+
+		sys.exit(0)
+
+	# Share the reduces of the large word sets across worker processes
+	shard_pool = HangmanShardPool.start(settings, context)
+
+	try:
+		batch_results = None
+
+		if settings.resultsfile != None:
+			# Stream the game records, on stdout the settings display goes to stderr
+			batch_results = HangmanBatchResults(settings.resultsfile)
+
+		# Grab the given secret from the generator function to start the game play!
+		# No more secrets, no more play
+		if settings.workers > 1:
+			runner = HangmanParallelRunner(settings, tree, context, settings.workers, settings.threads)
+			results = runner.play(settings.get_secrets())
+		else:
+			results = play_secrets(settings, tree, context, settings.get_secrets())
+
+		for secret, score, record in results:
+
+			total += score
+			count += 1
+
+			if batch_results != None:
+				batch_results.add(record)
+			else:
+				display.bare("{}: {}\n", secret.upper(), score)
+
+			#display.clock("Finished game\n")
+
+
+		# Compute the average score
+		avg = float(total) / float(max(count, 1))
+
+		if batch_results != None:
+			batch_results.close()
+			batch_results.report(display)
+
+	finally:
+		# stop the shard workers whatever happens to the game play
+		if shard_pool != None: shard_pool.close()
 
 	display.clock("End time")
 
+	display.clock("State cache {}", context.state_cache)
+
 	HangmanWordPassEngine.cleanup()
 
-	if count > 1: display.bare("Given {} words, average word score is {}".format(count, avg))
+	if settings.tracefile != None:
+		display.tracer.save(settings.tracefile)
+		display.clock("Traced {} events to {}", len(display.tracer), settings.tracefile)
+
+	if count > 1: display.bare("Given {} words, average word score is {}", count, avg)
@@ -0,0 +1,106 @@
+import argparse
+
+from HangmanSettings import HangmanSettings
+from HangmanLetterStrategy import HangmanLetterStrategy
+from HangmanWordPassEngine import HangmanWordPassEngine
+from HangmanTallyCache import HangmanTallyCache
+from HangmanGuessService import HangmanGuessService
+from HangmanGuessService import HangmanGuessServer
+from HangmanShardPool import HangmanShardPool
+
+
+if __name__ == '__main__':
+	"""
+	Driver code to serve guess suggestions to hangman games played elsewhere,
+	see HangmanGuessService for the protocol
+	"""
+
+	parser = argparse.ArgumentParser(prog='ServeHangman',
+		description='Serve hangman guess suggestions over TCP, one JSON request per line. ' \
+		+ 'E.g. python ServeHangman.py -f words.txt words_big.txt --port 8765')
+
+	parser.add_argument('-f', dest='dictfiles', required=True, type=str, nargs='+',
+		help='dictionary file names, the first is the default of the requests')
+
+	parser.add_argument('-engine', help='pass engine backend for reducing the word set',
+		dest='engine', type=str, default='memory', choices=HangmanGuessService.ENGINES)
+
+	parser.add_argument('-strategy', help='letter selection strategy',
+		dest='strategy', type=str, default='hybrid', choices=HangmanLetterStrategy.strategy_names())
+
+	parser.add_argument('-cache', help='game state cache size in megabytes, 0 to disable',
+		dest='cache_mb', type=int, default=64)
+
+	parser.add_argument('--host', dest='host', type=str, default='127.0.0.1',
+		help='address to listen on')
+
+	parser.add_argument('--port', dest='port', type=int, default=8765,
+		help='port to listen on')
+
+	parser.add_argument('--max-sessions', dest='max_sessions', type=int, default=10000,
+		help='number of game sessions kept, the least recently used are dropped beyond')
+
+	parser.add_argument('--shards', dest='shards', type=int, default=0,
+		help='number of worker processes sharing each large reduce of the default dictionary, ' \
+		+ '0 to reduce in process')
+
+	parser.add_argument('--shard-threshold', dest='shard_threshold', type=int, default=20000,
+		help='smallest word set reduced across the shard workers')
+
+	parser.add_argument('--tally-cache', dest='tally_cachedir', type=str,
+		help='directory of the first pass tallies cache files, defaults to ~/.cache/hangman')
+
+	parser.add_argument('--no-tally-cache', dest='tally_cache', action='store_false',
+		help='do not load or write the first pass tallies cache files')
+
+	parser.add_argument('-clk', '--clock',
+		dest='clockflag', action='store_true', help='enable timing output')
+
+	args = parser.parse_args()
+
+	settings = HangmanSettings(['-f', args.dictfiles[0], '-engine', args.engine, \
+		'-strategy', args.strategy, '-cache', str(args.cache_mb), '--shards', str(args.shards), \
+		'--shard-threshold', str(args.shard_threshold)] + (['-clk'] if args.clockflag else []) \
+		+ (['--tally-cache', args.tally_cachedir] if args.tally_cachedir != None else []) \
+		+ ([] if args.tally_cache else ['--no-tally-cache']))
+
+	display = settings.display
+
+	display.clock("Start time")
+
+	# The dictionary context is loaded once and shared by every session
+	HangmanWordPassEngine.initialize(settings)
+
+	context = HangmanWordPassEngine.context()
+
+	if settings.tally_cachefile != None:
+		tally_cache = HangmanTallyCache(settings.tally_cachefile)
+
+		if tally_cache.load(context) == False:
+			tally_cache.build(context)
+			tally_cache.save(context)
+
+	service = HangmanGuessService(settings, context, args.max_sessions)
+
+	# Share the first turn reduces of the large buckets across worker processes
+	shard_pool = HangmanShardPool.start(settings, context)
+
+	try:
+		# Identical dictionary files share the context loaded first
+		for name in args.dictfiles[1:]:
+			service.load(name)
+			display.clock("Loaded {}", name)
+
+		server = HangmanGuessServer(service, args.host, args.port)
+
+		display.clock("Serving")
+		display.bare("Serving {} guesses on {}:{}", args.strategy, *server.address)
+
+		server.serve()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		if shard_pool != None: shard_pool.close()
+
+		service.close()
+		HangmanWordPassEngine.cleanup()